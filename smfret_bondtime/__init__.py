@@ -3,5 +3,13 @@
 # SPDX-License-Identifier: BSD-3-Clause
 
 from ._version import __version__
-from .analysis import LifetimeAnalyzer, LifetimeResult, calc_track_stats
-from .io import load_data, save_data
+from .analysis import (
+    LifetimeAnalyzer,
+    LifetimeResult,
+    TrackLengthHistogram,
+    calc_track_stats,
+    calc_track_stats_chunked,
+    fit_lifetimes,
+)
+from .io import calc_track_stats_hdf, load_data, save_data, select_loc
+from .result_cache import ResultCache
@@ -7,4 +7,6 @@ import sys
 from . import gui
 
 
-sys.exit(gui.run())
+if __name__ == "__main__":
+    # Guard needed since worker processes may import the main module
+    sys.exit(gui.run())
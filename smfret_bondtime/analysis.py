@@ -2,24 +2,47 @@
 #
 # SPDX-License-Identifier: BSD-3-Clause
 
+import collections
 from collections import namedtuple
-from contextlib import suppress
+import concurrent.futures
+from contextlib import ExitStack, suppress
 import copy
 import math
-from typing import Any, Iterable, Mapping, Optional, Tuple
+import os
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
 import warnings
 
-import lifelines
 import matplotlib as mpl
 import matplotlib.axes  # noqa F401
 import numpy as np
 import pandas as pd
 import scipy.optimize
 
+from .result_cache import ResultCache
 from .sciform_lite import format_val, format_val_unc
 
 
 def calc_track_stats(tracks: pd.DataFrame, n_frames: int) -> pd.DataFrame:
+    """Calculate statistics for each track
+
+    Tracks are grouped by particle number only once; all statistics are computed
+    from the same grouping.
+
+    Parameters
+    ----------
+    tracks
+        Tracking data. Rows where the "extra_frame" column (if present) is not 0 are
+        ignored.
+    n_frames
+        Number of frames in the movie. Used to determine whether tracks are censored.
+
+    Returns
+    -------
+    One line per track with columns "start", "end" (first and last frame),
+    "track_len", "censored" (0 if not censored, 1 if left-censored, 2 if
+    right-censored, 3 if both), "mass", and "bg" (mean values). Index is the track
+    id.
+    """
     if tracks.empty:
         return pd.DataFrame(
             columns=[
@@ -32,25 +55,177 @@ def calc_track_stats(tracks: pd.DataFrame, n_frames: int) -> pd.DataFrame:
             ],
             index=pd.Index([], name="particle"),
         )
+    # only copy columns which are needed
+    keys = [k for k in ("mass", "bg") if k in tracks]
     if "extra_frame" in tracks:
-        tracks = tracks[tracks["extra_frame"] == 0]
+        tracks = tracks.loc[tracks["extra_frame"] == 0, ["particle", "frame", *keys]]
 
-    frame_counts = tracks.groupby("particle")["frame"].aggregate(["min", "max"])
+    grp = tracks.groupby("particle")
+    frame_counts = grp["frame"].aggregate(["min", "max"])
     frame_counts.columns = ["start", "end"]
     frame_counts["track_len"] = frame_counts["end"] - frame_counts["start"] + 1
 
-    censored_start = (frame_counts["start"].to_numpy() <= 0).astype(int)
-    censored_end = (frame_counts["end"].to_numpy() >= n_frames - 1).astype(int)
-    frame_counts["censored"] = censored_start | (censored_end << 1)
+    _set_censored(frame_counts, n_frames)
 
+    if keys:
+        # single call computes means of all columns
+        frame_counts[keys] = grp[keys].mean()
     for key in ("mass", "bg"):
-        if key in tracks:
-            frame_counts[key] = tracks.groupby("particle")[key].mean()
+        if key not in keys:
+            frame_counts[key] = np.nan
+    return frame_counts
+
+
+def _set_censored(track_stats: pd.DataFrame, n_frames: int):
+    """Add "censored" column to track stats computed from "start" and "end" frames"""
+    censored_start = (track_stats["start"].to_numpy() <= 0).astype(int)
+    censored_end = (track_stats["end"].to_numpy() >= n_frames - 1).astype(int)
+    track_stats["censored"] = censored_start | (censored_end << 1)
+
+
+def calc_track_stats_chunked(
+    chunks: Iterable[pd.DataFrame], n_frames: int
+) -> pd.DataFrame:
+    """Calculate statistics for each track from chunks of tracking data
+
+    Per-particle partial results (first and last frame, number of values and sums)
+    are combined across chunks, so only one chunk needs to be held in memory at a
+    time. A track may be spread over any number of chunks. Results are identical to
+    calling :py:func:`calc_track_stats` on the concatenated chunks.
+
+    Parameters
+    ----------
+    chunks
+        Tracking data split into chunks of rows. Order of rows has to be the same as
+        in the full data set, since the order of summation affects rounding.
+    n_frames
+        Number of frames in the movie. Used to determine whether tracks are censored.
+
+    Returns
+    -------
+    Same as :py:func:`calc_track_stats`
+    """
+    first = None
+    ids = None
+    for chunk in chunks:
+        if first is None:
+            first = chunk
+            keys = [k for k in ("mass", "bg") if k in chunk]
+        if "extra_frame" in chunk:
+            chunk = chunk[chunk["extra_frame"] == 0]
+        if chunk.empty:
+            continue
+
+        frames = chunk.groupby("particle")["frame"].aggregate(["min", "max"])
+        c_ids = frames.index.to_numpy()
+        if ids is None:
+            ids = c_ids[:0]
+            start = frames["min"].to_numpy()[:0]
+            end = frames["max"].to_numpy()[:0]
+            n_obs = np.zeros((0, len(keys)), dtype=np.intp)
+            sums = np.zeros((0, len(keys)))
+            comp = np.zeros((0, len(keys)))
+        new_ids = np.union1d(ids, c_ids)
+        if len(new_ids) > len(ids):
+            old_idx = np.searchsorted(new_ids, ids)
+            start, end, n_obs, sums, comp = (
+                _expand_rows(a, old_idx, len(new_ids))
+                for a in (start, end, n_obs, sums, comp)
+            )
+            seen = np.zeros(len(new_ids), dtype=bool)
+            seen[old_idx] = True
+            ids = new_ids
         else:
+            seen = np.ones(len(ids), dtype=bool)
+
+        c_idx = np.searchsorted(ids, c_ids)
+        c_seen = seen[c_idx]
+        start[c_idx] = np.where(
+            c_seen, np.minimum(start[c_idx], frames["min"]), frames["min"]
+        )
+        end[c_idx] = np.where(
+            c_seen, np.maximum(end[c_idx], frames["max"]), frames["max"]
+        )
+
+        codes = np.searchsorted(ids, chunk["particle"].to_numpy())
+        for i, k in enumerate(keys):
+            v = chunk[k].to_numpy(dtype=float)
+            # like pandas, ignore NaNs
+            is_num = ~np.isnan(v)
+            n_obs[:, i] += np.bincount(codes[is_num], minlength=len(ids))
+            _kahan_group_sum(v[is_num], codes[is_num], sums[:, i], comp[:, i])
+
+    if ids is None:
+        # no data; treat the same way as `calc_track_stats`
+        if first is None:
+            first = pd.DataFrame()
+        return calc_track_stats(first, n_frames)
+
+    frame_counts = pd.DataFrame(
+        {"start": start, "end": end}, index=pd.Index(ids, name="particle")
+    )
+    frame_counts["track_len"] = frame_counts["end"] - frame_counts["start"] + 1
+    _set_censored(frame_counts, n_frames)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.where(n_obs > 0, sums / n_obs, np.nan)
+    for i, k in enumerate(keys):
+        frame_counts[k] = means[:, i]
+    for key in ("mass", "bg"):
+        if key not in keys:
             frame_counts[key] = np.nan
     return frame_counts
 
 
+def _expand_rows(a: np.ndarray, idx: np.ndarray, n: int) -> np.ndarray:
+    """Create array with `n` rows (initialized to 0) and set ``ret[idx] = a``"""
+    ret = np.zeros((n, *a.shape[1:]), dtype=a.dtype)
+    ret[idx] = a
+    return ret
+
+
+def _kahan_group_sum(
+    values: np.ndarray, codes: np.ndarray, sums: np.ndarray, comp: np.ndarray
+):
+    """Add values to per-group sums using compensated (Kahan) summation
+
+    This replicates pandas' algorithm for groupby means so that results are
+    identical. Values are added in order of appearance within each group.
+
+    Parameters
+    ----------
+    values
+        Values to add. Must not contain NaNs.
+    codes
+        Group index for each entry of `values`
+    sums, comp
+        Sums and compensation terms for each group. Modified in place.
+    """
+    if not len(values):
+        return
+    order = np.argsort(codes, kind="stable")
+    values = values[order]
+    grp, first, count = np.unique(codes[order], return_index=True, return_counts=True)
+    # Sort groups by size so that groups which have a `k`-th value form a prefix
+    by_size = np.argsort(-count, kind="stable")
+    grp = grp[by_size]
+    first = first[by_size]
+    n_active = np.searchsorted(-count[by_size], -np.arange(count.max()))
+
+    s = sums[grp]
+    c = comp[grp]
+    with np.errstate(invalid="ignore"):
+        for k, na in enumerate(n_active):
+            y = values[first[:na] + k] - c[:na]
+            t = s[:na] + y
+            c_k = (t - s[:na]) - y
+            # pandas resets the compensation if it is NaN (infinite values)
+            c_k[np.isnan(c_k)] = 0.0
+            c[:na] = c_k
+            s[:na] = t
+    sums[grp] = s
+    comp[grp] = c
+
+
 def apply_filters(
     track_stats: pd.DataFrame,
     columns: Iterable[Any] = ["filter_param", "filter_manual"],
@@ -79,6 +254,187 @@ def concat_stats(track_stats, filter=True):
     return ret
 
 
+TrackLengthCounts = namedtuple("TrackLengthCounts", ["track_len", "censored", "count"])
+
+
+class TrackLengthHistogram(collections.abc.Mapping):
+    """Number of tracks for each ``(track_len, censored)`` pair per recording interval
+
+    Maps recording interval -> :py:class:`TrackLengthCounts`, where each entry is an
+    array. Pairs are unique and sorted by track length, then censoring. Since lifetime
+    fits only depend on these counts, they scale with the number of distinct track
+    lengths instead of the number of tracks.
+    """
+
+    def __init__(self, counts: Mapping[Any, TrackLengthCounts]):
+        """Parameters
+        ----------
+        counts
+            Maps recording interval -> unique track lengths, censoring flags, and
+            corresponding number of tracks
+        """
+        self._counts = dict(counts)
+
+    @classmethod
+    def from_track_stats(
+        cls,
+        track_stats: (
+            Mapping[Any, pd.DataFrame]
+            | Mapping[Any, Mapping[Any, pd.DataFrame]]
+            | "TrackLengthHistogram"
+        ),
+        filter_columns: Iterable[Any] = ["filter_param", "filter_manual"],
+    ) -> "TrackLengthHistogram":
+        """Count tracks
+
+        Parameters
+        ----------
+        track_stats
+            Maps recording interval -> track stats or interval -> file id -> track
+            stats. If this is already a :py:class:`TrackLengthHistogram`, it is
+            returned unchanged.
+        filter_columns
+            Only tracks where all of these columns are 0 are counted. See
+            :py:func:`apply_filters`.
+        """
+        if isinstance(track_stats, cls):
+            return track_stats
+        counts = {}
+        for intv, ts in track_stats.items():
+            if isinstance(ts, pd.DataFrame):
+                ts = {None: ts}
+            lengths = []
+            cens = []
+            for t in ts.values():
+                if not isinstance(t, pd.DataFrame) or t.empty:
+                    continue
+                t = apply_filters(t, filter_columns)
+                lengths.append(t["track_len"].to_numpy(dtype=np.int64))
+                cens.append(t["censored"].to_numpy(dtype=np.int64))
+            counts[intv] = cls.count(
+                np.concatenate(lengths) if lengths else np.empty(0, dtype=np.int64),
+                np.concatenate(cens) if cens else np.empty(0, dtype=np.int64),
+            )
+        return cls(counts)
+
+    @staticmethod
+    def count(track_len: np.ndarray, censored: np.ndarray) -> TrackLengthCounts:
+        """Count occurrences of ``(track_len, censored)`` pairs
+
+        Parameters
+        ----------
+        track_len
+            Track lengths
+        censored
+            Censoring flag (0 to 3) for each entry of `track_len`
+
+        Returns
+        -------
+        Unique pairs and number of occurrences
+        """
+        # censoring flags use two bits, so pairs can be encoded as a single integer
+        key, count = np.unique(
+            (np.asarray(track_len, dtype=np.int64) << 2)
+            | np.asarray(censored, dtype=np.int64),
+            return_counts=True,
+        )
+        return TrackLengthCounts(key >> 2, key & 3, count)
+
+    def truncate(self, min_length: int) -> "TrackLengthHistogram":
+        """Remove tracks shorter than `min_length`"""
+        ret = {}
+        for intv, c in self._counts.items():
+            start = np.searchsorted(c.track_len, min_length)
+            ret[intv] = TrackLengthCounts(*(a[start:] for a in c))
+        return type(self)(ret)
+
+    def __getitem__(self, key) -> TrackLengthCounts:
+        return self._counts[key]
+
+    def __iter__(self):
+        return iter(self._counts)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+def fit_censored_exponential(
+    track_len: np.ndarray,
+    censored: np.ndarray,
+    entry: int = 0,
+    weights: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Maximum likelihood estimate of the mean lifetime from track lengths
+
+    A track of length ``n`` ended between ``n - 1`` and ``n`` frames after its start
+    (interval-censored) unless it is right-censored, in which case it lasted at least
+    ``n - 1`` frames. Only tracks lasting longer than `entry` frames are observed
+    (left truncation). For an exponential distribution with rate ``k``, the
+    log-likelihood is ``-A k + m log(1 - exp(-k))``, where ``A`` is the sum of
+    ``n - 1 - entry`` over all tracks and ``m`` is the number of tracks which are not
+    right-censored. Thus the estimate is ``k = log(1 + m / A)`` and the standard
+    error is derived from the observed Fisher information.
+
+    Parameters
+    ----------
+    track_len
+        Track lengths. Tracks with ``track_len <= entry`` need to be removed
+        beforehand.
+    censored
+        Censoring flags for each entry of `track_len`. Bit 1 (value 2) marks
+        right-censored tracks.
+    entry
+        Truncation time
+    weights
+        Number of tracks with the respective length and censoring. If 2D, each row
+        is treated as a separate sample. If `None`, each entry of `track_len`
+        represents a single track.
+
+    Returns
+    -------
+    Mean lifetime (inverse rate) in frames and its standard error. Array with one
+    entry per row of `weights` if it is 2D. NaN if the estimate is not finite and
+    positive.
+    """
+    track_len = np.asarray(track_len, dtype=float)
+    not_right = (np.asarray(censored, dtype=int) & 2) == 0
+    if weights is None:
+        weights = np.ones_like(track_len)
+    weights = np.asarray(weights, dtype=float)
+
+    a = weights @ (track_len - 1 - entry)
+    m = weights @ not_right
+    return _censored_exponential_mle(a, m)
+
+
+def _censored_exponential_mle(
+    a: np.ndarray | float, m: np.ndarray | float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Censored exponential MLE from sufficient statistics
+
+    See :py:func:`fit_censored_exponential` for details.
+
+    Parameters
+    ----------
+    a
+        Sum of excess track lengths ``n - 1 - entry``
+    m
+        Number of tracks which are not right-censored
+
+    Returns
+    -------
+    Mean lifetime in frames and its standard error
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.log1p(m / a)
+        scale = 1 / rate
+        # Inverse of observed Fisher information w.r.t. the rate is m / (a (a + m))
+        scale_err = np.sqrt(m / (a * (a + m))) * scale**2
+    valid = (a > 0) & (m > 0)
+    # `[()]` converts 0-dim arrays to scalars
+    return np.where(valid, scale, np.nan)[()], np.where(valid, scale_err, np.nan)[()]
+
+
 def rec_interval_label(time_unit=None):
     if time_unit is None:
         return r"recording interval $\Delta t$"
@@ -94,43 +450,63 @@ def app_lifetime_label(time_unit=None):
 LifetimeResult = namedtuple(
     "LifetimeResult", ["lifetime", "bleach", "lifetime_err", "bleach_err"]
 )
+BootstrapReplicates = namedtuple("BootstrapReplicates", ["lifetime_app", "lifetime"])
 
 
 class LifetimeAnalyzer:
-    track_stats: (
-        Mapping[Any, pd.DataFrame] | Mapping[Any, Mapping[Any, pd.DataFrame]] | None
-    )
-    """Maps recording interval -> track stats or recording interval -> file id -> track
-    stats.
-    Track stats are dataFrames with information about one track per line. Index is the
-    track id. Other columns are "track_len": number of frames (first to last, including
-    possible missing frames); "censored": 0 if not censored, 1 if left-censored, 2 if
-    right-censored, 3 if both.
-    """
     apparent_lifetimes: Optional[pd.DataFrame]
     """Information about apparent lifetimes, one line for each recording interval.
     Columns: "interval", "lifetime_app", "lifetime_app_err", "track_count".
     """
     lifetime: Optional[LifetimeResult]
     """Result of fitting :py:meth:`lifetime_model` to :py:attr:`apparent_lifetimes`"""
+    bootstrap_n_outliers: int
+    """Number of bootstrap replicates discarded as outliers"""
+    bootstrap_n_replicates: int
+    """Number of bootstrap replicates computed"""
+    bootstrap_replicates: Optional[BootstrapReplicates]
+    """Per-replicate results of the last :py:meth:`calc_lifetime_bootstrap` call.
+    "lifetime_app" is an array of apparent lifetimes (one row per replicate, one column
+    per recording interval), "lifetime" is an array of ``(t_on, c_bleach)`` pairs (one
+    row per replicate).
+    """
+    result_cache: Optional[ResultCache]
+    """If not `None`, results of :py:meth:`calc_apparent_lifetimes` and
+    :py:meth:`calc_lifetime_bootstrap` (with an integer seed) are stored in and
+    retrieved from this cache. Keys are derived from the filtered track length
+    histogram and all parameters, so results are reused only if inputs match.
+    """
 
     def __init__(
         self,
         track_stats: (
-            Mapping[Any, pd.DataFrame] | Mapping[Any, Mapping[Any, pd.DataFrame]] | None
+            Mapping[Any, pd.DataFrame]
+            | Mapping[Any, Mapping[Any, pd.DataFrame]]
+            | TrackLengthHistogram
+            | None
         ),
         min_track_length=2,
         min_track_count=10,
         max_init_bleach=1e3,
         max_init_lifetime=1e7,
+        filter_columns=["filter_param", "filter_manual"],
+        result_cache=None,
     ):
         """Parameters
         ----------
         track_stats
             Maps measurement interval -> track stats or interval -> file id -> track
-            stats
+            stats, or histogram of filtered track lengths
+        filter_columns
+            Only tracks where all of these columns are 0 are used. See
+            :py:func:`apply_filters`.
+        result_cache
+            Set :py:attr:`result_cache`. If a path, create a
+            :py:class:`ResultCache` using this directory.
         """
-        self.min_track_length = min_track_length
+        self._cache = {}
+        self._min_track_length = min_track_length
+        self._filter_columns = list(filter_columns)
         self.min_track_count = min_track_count
         self.max_init_bleach = max_init_bleach
         self.max_init_lifetime = max_init_lifetime
@@ -138,18 +514,173 @@ class LifetimeAnalyzer:
         self.apparent_lifetimes = None
         self.lifetime = None
         self.bootstrap_n_outliers = 0
+        self.bootstrap_n_replicates = 0
+        self.bootstrap_replicates = None
+        if result_cache is not None and not isinstance(result_cache, ResultCache):
+            result_cache = ResultCache(result_cache)
+        self.result_cache = result_cache
+
+    @property
+    def track_stats(
+        self,
+    ) -> (
+        Mapping[Any, pd.DataFrame]
+        | Mapping[Any, Mapping[Any, pd.DataFrame]]
+        | TrackLengthHistogram
+        | None
+    ):
+        """Maps recording interval -> track stats or recording interval -> file id ->
+        track stats.
+        Track stats are dataFrames with information about one track per line. Index is
+        the track id. Other columns are "track_len": number of frames (first to last,
+        including possible missing frames); "censored": 0 if not censored, 1 if
+        left-censored, 2 if right-censored, 3 if both.
+        Alternatively, this can be a :py:class:`TrackLengthHistogram` of filtered
+        tracks.
+
+        Concatenated and filtered data derived from this are cached. Setting this
+        clears the cache. If track stats are modified in place, call
+        :py:meth:`clear_cache`.
+        """
+        return self._track_stats
+
+    @track_stats.setter
+    def track_stats(self, ts):
+        self._track_stats = ts
+        self.clear_cache()
+
+    @property
+    def min_track_length(self) -> int:
+        """Tracks shorter than this are not used for analysis"""
+        return self._min_track_length
+
+    @min_track_length.setter
+    def min_track_length(self, m):
+        if m == self._min_track_length:
+            return
+        self._min_track_length = m
+        self._cache.pop("truncated_histogram", None)
+
+    @property
+    def filter_columns(self) -> list:
+        """Only tracks where all of these columns are 0 are used. See
+        :py:func:`apply_filters`.
+        """
+        return self._filter_columns
+
+    @filter_columns.setter
+    def filter_columns(self, c):
+        c = list(c)
+        if c == self._filter_columns:
+            return
+        self._filter_columns = c
+        self.clear_cache()
+
+    def clear_cache(self):
+        """Clear cached concatenated and filtered track stats
+
+        This needs to be called if :py:attr:`track_stats` are modified in place.
+        """
+        # Create new dict instead of clearing so that shallow copies are not affected
+        self._cache = {}
 
     def get_apparent_lifetime(
-        self, track_lengths: pd.DataFrame, interval: float
+        self, track_lengths: pd.DataFrame | TrackLengthCounts, interval: float
     ) -> Tuple[float, float]:
-        track_lengths = apply_filters(track_lengths)
-        count = track_lengths["track_len"].to_numpy()
-        cens = track_lengths["censored"].to_numpy()
+        c = self._get_track_length_counts(track_lengths)
+        return self._fit_apparent_lifetime(c.track_len, c.censored, interval, c.count)
+
+    def get_apparent_lifetime_lifelines(
+        self, track_lengths: pd.DataFrame | TrackLengthCounts, interval: float
+    ) -> Tuple[float, float]:
+        """Same as :py:meth:`get_apparent_lifetime`, but use :py:mod:`lifelines`
+
+        This is considerably slower, but may serve as a cross-check.
+        """
+        c = self._get_track_length_counts(track_lengths)
+        return self._fit_apparent_lifetime_lifelines(
+            c.track_len, c.censored, interval, c.count
+        )
 
-        min_mask = count >= self.min_track_length
-        count_min = count[min_mask]
-        cens_min = cens[min_mask]
+    def _get_track_length_counts(
+        self, track_lengths: pd.DataFrame | TrackLengthCounts
+    ) -> TrackLengthCounts:
+        """Count tracks at least :py:attr:`min_track_length` long
 
+        Parameters
+        ----------
+        track_lengths
+            Either track stats, which are filtered using :py:func:`apply_filters`,
+            or already counted tracks.
+
+        Returns
+        -------
+        Counts of tracks
+        """
+        if isinstance(track_lengths, pd.DataFrame):
+            track_lengths = apply_filters(track_lengths, self.filter_columns)
+            track_lengths = TrackLengthHistogram.count(
+                track_lengths["track_len"].to_numpy(),
+                track_lengths["censored"].to_numpy(),
+            )
+        start = np.searchsorted(track_lengths.track_len, self.min_track_length)
+        return TrackLengthCounts(*(a[start:] for a in track_lengths))
+
+    def _fit_apparent_lifetime(
+        self,
+        count: np.ndarray,
+        cens: np.ndarray,
+        interval: float,
+        weights: Optional[np.ndarray] = None,
+    ) -> Tuple[float, float, int]:
+        """Fit censored exponential distribution to track lengths
+
+        Parameters
+        ----------
+        count
+            Track lengths. Tracks shorter than :py:attr:`min_track_length` need to be
+            removed beforehand.
+        cens
+            Censoring flags for each entry of `count`
+        interval
+            Recording interval
+        weights
+            Number of tracks with the respective length and censoring. If `None`,
+            each entry of `count` represents a single track. If 2D, each row is
+            fit separately and arrays are returned.
+
+        Returns
+        -------
+        Apparent lifetime, its standard error, and the number of tracks
+        """
+        if weights is None:
+            n_tracks = len(count)
+        else:
+            n_tracks = weights.sum(axis=-1).astype(int)
+        lt, err = fit_censored_exponential(
+            count, cens, max(self.min_track_length - 1, 0), weights
+        )
+        return lt * interval, err * interval, n_tracks
+
+    def _fit_apparent_lifetime_lifelines(
+        self,
+        count: np.ndarray,
+        cens: np.ndarray,
+        interval: float,
+        weights: Optional[np.ndarray] = None,
+    ) -> Tuple[float, float, int]:
+        """Same as :py:meth:`_fit_apparent_lifetime`, but use :py:mod:`lifelines`
+
+        `weights` cannot be 2D.
+        """
+        import lifelines
+
+        n_tracks = len(count) if weights is None else int(weights.sum())
+        if weights is not None:
+            nonzero = weights > 0
+            count = count[nonzero]
+            cens = cens[nonzero]
+            weights = weights[nonzero]
         with warnings.catch_warnings(record=True) as cw:
             warnings.filterwarnings(
                 "always",
@@ -158,79 +689,397 @@ class LifetimeAnalyzer:
             )
             try:
                 fit_res = lifelines.ExponentialFitter().fit_interval_censoring(
-                    count_min - 1,
-                    np.where(cens_min & 2, np.inf, count_min),
+                    count - 1,
+                    np.where(cens & 2, np.inf, count),
                     entry=(
                         self.min_track_length - 1 if self.min_track_length > 1 else None
                     ),
+                    weights=weights,
                     # use naive result as initial guess
                     initial_point=np.array(
-                        [count_min.mean() - self.min_track_length + 0.5]
+                        [
+                            np.average(count, weights=weights)
+                            - self.min_track_length
+                            + 0.5
+                        ]
                     ),
                 )
             except Exception:
-                return np.nan, np.nan, len(count_min)
+                return np.nan, np.nan, n_tracks
         err = (
             np.sqrt(fit_res.variance_matrix_.to_numpy().item()) * interval
             if not cw
             else np.nan
         )
-        return fit_res.lambda_ * interval, err, len(count_min)
+        return fit_res.lambda_ * interval, err, n_tracks
 
     def get_apparent_lifetime_basic(
-        self, track_lengths: pd.DataFrame, interval: float
+        self, track_lengths: pd.DataFrame | TrackLengthCounts, interval: float
     ) -> Tuple[float, float]:
-        track_lengths = apply_filters(track_lengths)
-        count = track_lengths["track_len"].to_numpy()
-        min_mask = count >= self.min_track_length
-        count_min = count[min_mask]
+        c = self._get_track_length_counts(track_lengths)
+        n = c.count.sum()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = (c.count @ c.track_len) / n
+            std = np.sqrt((c.count @ (c.track_len - mean) ** 2) / (n - 1))
 
         return (
-            (count_min.mean() - self.min_track_length + 0.5) * interval,
-            count_min.std(ddof=1) / np.sqrt(len(count_min)) * interval,
-            len(count_min),
+            (mean - self.min_track_length + 0.5) * interval,
+            std / np.sqrt(n) * interval,
+            n,
+        )
+
+    def _result_cache_key(self, **params) -> str:
+        """Compute :py:attr:`result_cache` key
+
+        Parameters
+        ----------
+        **params
+            Parameters of the computation in addition to attributes of this
+            instance
+
+        Returns
+        -------
+        Key derived from filtered track length histogram and parameters
+        """
+        hist = self.get_track_length_histogram()
+        keys = sorted(hist, key=float)
+        return ResultCache.make_key(
+            {
+                "intervals": [float(k) for k in keys],
+                "min_track_length": self.min_track_length,
+                "min_track_count": self.min_track_count,
+                "max_init_bleach": self.max_init_bleach,
+                "max_init_lifetime": self.max_init_lifetime,
+                **params,
+            },
+            (a for k in keys for a in hist[k]),
         )
 
     def calc_apparent_lifetimes(self, method="survival"):
+        key = None
+        if self.result_cache is not None:
+            key = self._result_cache_key(kind="apparent_lifetimes", method=method)
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                self.apparent_lifetimes = pd.DataFrame(cached)
+                return
+
         if method == "survival":
             method = self.get_apparent_lifetime
+        elif method == "lifelines":
+            method = self.get_apparent_lifetime_lifelines
         elif method == "basic":
             method = self.get_apparent_lifetime_basic
         else:
-            raise ValueError('method needs to be "survival" or "basic"')
+            raise ValueError('method needs to be "survival", "lifelines", or "basic"')
 
         app_lt = []
-        # filtering is done in `get_apparent_lifetime*` methods
-        track_stats = concat_stats(self.track_stats, filter=False)
-        for intv, ts in track_stats.items():
+        for intv, counts in self.get_track_length_histogram().items():
             intv = float(intv)
-            app_lt.append((intv, *method(ts, intv)))
+            app_lt.append((intv, *method(counts, intv)))
         self.apparent_lifetimes = pd.DataFrame(
             app_lt,
             columns=["interval", "lifetime_app", "lifetime_app_err", "track_count"],
         ).sort_values("interval", ignore_index=True)
+        if key is not None:
+            self.result_cache.put(
+                key, {c: v.to_numpy() for c, v in self.apparent_lifetimes.items()}
+            )
+
+    def sweep_min_track_length(
+        self, min_track_lengths: Iterable[int], method="survival"
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Calculate lifetimes for a range of minimum track lengths
+
+        This is equivalent to setting :py:attr:`min_track_length` to each value and
+        calling :py:meth:`calc_apparent_lifetimes` and :py:meth:`calc_lifetime`, but
+        apparent lifetimes for all values are computed from cumulative sums over
+        sorted track lengths. :py:attr:`apparent_lifetimes` and :py:attr:`lifetime`
+        are not modified.
+
+        Parameters
+        ----------
+        min_track_lengths
+            Minimum track lengths to evaluate
+        method
+            How to calculate apparent lifetimes. Either ``"survival"`` or ``"basic"``.
+
+        Returns
+        -------
+        Apparent lifetimes (columns "min_track_length", "interval", "lifetime_app",
+        "lifetime_app_err", "track_count") and lifetimes (columns
+        "min_track_length", "lifetime", "bleach", "lifetime_err", "bleach_err").
+        """
+        if method not in ("survival", "basic"):
+            raise ValueError('method needs to be "survival" or "basic"')
+
+        min_len = np.asarray(min_track_lengths, dtype=np.int64).ravel()
+        hist = self.get_track_length_histogram()
+        keys = sorted(hist, key=float)
+        intervals = np.array([float(k) for k in keys], dtype=float)
+        app_lt = np.empty((len(min_len), len(keys)))
+        app_lt_err = np.empty_like(app_lt)
+        track_count = np.empty(app_lt.shape, dtype=np.int64)
+        for i, (intv, k) in enumerate(zip(intervals, keys)):
+            c = hist[k]
+            length = c.track_len.astype(float)
+
+            def suffix_sum(x):
+                # sum over all entries with track_len >= min_len
+                return np.concatenate([np.cumsum(x[::-1])[::-1], [0]])[
+                    np.searchsorted(c.track_len, min_len)
+                ]
+
+            n = suffix_sum(c.count)
+            track_count[:, i] = n
+            len_sum = suffix_sum(c.count * length)
+            if method == "survival":
+                entry = np.maximum(min_len - 1, 0)
+                lt, err = _censored_exponential_mle(
+                    len_sum - n * (1 + entry),
+                    suffix_sum(c.count * ((c.censored & 2) == 0)),
+                )
+            else:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    mean = len_sum / n
+                    var = (suffix_sum(c.count * length**2) - len_sum * mean) / (n - 1)
+                    lt = mean - min_len + 0.5
+                    err = np.sqrt(var / n)
+            app_lt[:, i] = lt * intv
+            app_lt_err[:, i] = err * intv
+
+        apparent = pd.DataFrame(
+            {
+                "min_track_length": np.repeat(min_len, len(keys)),
+                "interval": np.tile(intervals, len(min_len)),
+                "lifetime_app": app_lt.ravel(),
+                "lifetime_app_err": app_lt_err.ravel(),
+                "track_count": track_count.ravel(),
+            }
+        )
+        lifetimes = []
+        count_ok = track_count >= self.min_track_count
+        for j in range(len(min_len)):
+            valid = count_ok[j] & np.isfinite(app_lt[j]) & np.isfinite(app_lt_err[j])
+            lifetimes.append(
+                self._fit_lifetime_model(
+                    intervals[valid], app_lt[j, valid], app_lt_err[j, valid]
+                )
+            )
+        lifetimes = pd.DataFrame(lifetimes, columns=LifetimeResult._fields)
+        lifetimes.insert(0, "min_track_length", min_len)
+        return apparent, lifetimes
+
+    def get_track_length_histogram(self, truncate=False) -> TrackLengthHistogram:
+        """Count filtered tracks per recording interval
+
+        The result is cached.
+
+        Parameters
+        ----------
+        truncate
+            If `True`, only count tracks at least :py:attr:`min_track_length` long.
+
+        Returns
+        -------
+        Histogram of tracks
+        """
+        key = "truncated_histogram" if truncate else "histogram"
+        with suppress(KeyError):
+            return self._cache[key]
+        if truncate:
+            ret = self.get_track_length_histogram().truncate(self.min_track_length)
+        else:
+            ret = TrackLengthHistogram.from_track_stats(
+                self.track_stats, self.filter_columns
+            )
+        self._cache[key] = ret
+        return ret
+
+    def get_filtered_stats(self) -> Dict[Any, pd.DataFrame]:
+        """Concatenate track stats of all files and apply filters
+
+        The result is cached.
+
+        Returns
+        -------
+        Maps recording interval -> filtered track stats
+        """
+        with suppress(KeyError):
+            return self._cache["filtered"]
+        ret = {
+            k: apply_filters(ts, self.filter_columns)
+            for k, ts in concat_stats(self.track_stats, filter=False).items()
+        }
+        self._cache["filtered"] = ret
+        return ret
 
     @staticmethod
     def lifetime_model(interval, t_on, c_bleach):
         return 1 / (1 / t_on + 1 / (c_bleach * interval))
 
-    def calc_lifetime(self):
+    def calc_lifetime(self, method="two-stage"):
+        """Calculate lifetime and bleaching constant
+
+        Parameters
+        ----------
+        method
+            If ``"two-stage"``, fit :py:meth:`lifetime_model` to
+            :py:attr:`apparent_lifetimes`. If ``"likelihood"``, maximize the joint
+            likelihood of track lengths of all recording intervals w.r.t. ``t_on``
+            and ``c_bleach`` directly. Errors are derived from the observed Fisher
+            information. In both cases, :py:attr:`apparent_lifetimes` are
+            calculated if not present yet.
+        """
         if self.apparent_lifetimes is None:
             self.calc_apparent_lifetimes()
+        if method == "likelihood":
+            self.lifetime = self._fit_lifetime_likelihood()
+            return
+        if method != "two-stage":
+            raise ValueError('method needs to be "two-stage" or "likelihood"')
+
         apparent = self.prepare_apparent_lifetimes()
-        intervals = apparent["interval"].to_numpy()
-        app_lt = apparent["lifetime_app"].to_numpy()
-        errors = (
-            apparent["lifetime_app_err"] if "lifetime_app_err" in apparent else None
+        self.lifetime = self._fit_lifetime_model(
+            apparent["interval"].to_numpy(),
+            apparent["lifetime_app"].to_numpy(),
+            (
+                apparent["lifetime_app_err"].to_numpy()
+                if "lifetime_app_err" in apparent
+                else None
+            ),
         )
 
-        # initial guesses
-        k_bleach_init, k_off_init = np.polyfit(1 / intervals, 1 / app_lt, 1)
-        # polyfit can yield negative values
-        k_off_init = max(k_off_init, 1 / self.max_init_lifetime)
-        k_bleach_init = max(k_bleach_init, 1 / self.max_init_bleach)
+    def _fit_lifetime_likelihood(
+        self, max_iter: int = 100, rtol: float = 1e-10
+    ) -> LifetimeResult:
+        """Maximum likelihood fit of lifetime and bleaching constant
+
+        With ``k_off = 1 / t_on`` and ``k_bleach = 1 / c_bleach``, the rate (per
+        frame) of the track length distribution for recording interval ``dt`` is
+        ``dt * k_off + k_bleach``. Summing the log-likelihood given in
+        :py:func:`fit_censored_exponential` over all intervals results in a concave
+        function of ``(k_off, k_bleach)``, which is maximized using Newton's method.
+        Only intervals with at least :py:attr:`min_track_count` tracks are used.
+
+        Parameters
+        ----------
+        max_iter
+            Maximum number of Newton iterations
+        rtol
+            Stop if the relative change of parameters is less than this
+
+        Returns
+        -------
+        Fit result. If fitting failed, all entries are NaN.
+        """
+        failed = LifetimeResult(np.nan, np.nan, np.nan, np.nan)
+
+        hist = self.get_track_length_histogram(truncate=True)
+        entry = max(self.min_track_length - 1, 0)
+        intervals = []
+        a = []
+        m = []
+        for intv, c in hist.items():
+            if c.count.sum() < self.min_track_count:
+                continue
+            intervals.append(float(intv))
+            a.append(c.count @ (c.track_len - 1 - entry))
+            m.append(c.count @ ((c.censored & 2) == 0))
+        if len(intervals) < 2:
+            return failed
+        intervals = np.array(intervals)
+        a = np.array(a, dtype=float)
+        m = np.array(m, dtype=float)
+        jac = np.column_stack([intervals, np.ones_like(intervals)])
 
+        def log_lik(k):
+            rate = jac @ k
+            if np.any(rate <= 0):
+                return -np.inf
+            return np.sum(-a * rate + m * np.log(-np.expm1(-rate)))
+
+        def derivatives(k):
+            rate = jac @ k
+            with np.errstate(divide="ignore", invalid="ignore"):
+                d1 = -a + m / np.expm1(rate)
+                d2 = -m * np.exp(-rate) / np.expm1(-rate) ** 2
+            return jac.T @ d1, jac.T @ (d2[:, None] * jac)
+
+        # initial guess from linear regression of per-interval rates
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rate_init = np.log1p(m / a)
+        valid = np.isfinite(rate_init)
+        if valid.sum() < 2:
+            return failed
+        k_off, k_bleach = np.polyfit(intervals[valid], rate_init[valid], 1)
+        k = np.array(
+            [
+                max(k_off, 1 / self.max_init_lifetime),
+                max(k_bleach, 1 / self.max_init_bleach),
+            ]
+        )
+
+        ll = log_lik(k)
+        for _ in range(max_iter):
+            grad, hess = derivatives(k)
+            try:
+                step = -np.linalg.solve(hess, grad)
+            except np.linalg.LinAlgError:
+                return failed
+            # backtracking line search; keeps rates positive
+            for _ in range(50):
+                k_new = k + step
+                ll_new = log_lik(k_new)
+                if ll_new >= ll:
+                    break
+                step /= 2
+            else:
+                break
+            k, ll = k_new, ll_new
+            if np.all(np.abs(step) <= rtol * np.abs(k)):
+                break
+        else:
+            return failed
+
+        _, hess = derivatives(k)
         try:
+            cov = np.linalg.inv(-hess)
+        except np.linalg.LinAlgError:
+            return failed
+        t_on, c_bleach = 1 / k
+        # error propagation for x -> 1 / x
+        t_on_err, c_bleach_err = np.sqrt(np.diag(cov)) / k**2
+        return LifetimeResult(t_on, c_bleach, t_on_err, c_bleach_err)
+
+    def _fit_lifetime_model(
+        self,
+        intervals: np.ndarray,
+        app_lt: np.ndarray,
+        errors: Optional[np.ndarray] = None,
+    ) -> LifetimeResult:
+        """Fit :py:meth:`lifetime_model` to apparent lifetimes
+
+        Parameters
+        ----------
+        intervals
+            Recording intervals
+        app_lt
+            Apparent lifetime for each entry of `intervals`
+        errors
+            Standard errors of `app_lt`. If `None`, fit is unweighted.
+
+        Returns
+        -------
+        Fit result. If fitting failed, all entries are NaN.
+        """
+        try:
+            # initial guesses
+            k_bleach_init, k_off_init = np.polyfit(1 / intervals, 1 / app_lt, 1)
+            # polyfit can yield negative values
+            k_off_init = max(k_off_init, 1 / self.max_init_lifetime)
+            k_bleach_init = max(k_bleach_init, 1 / self.max_init_bleach)
+
             with warnings.catch_warnings():
                 # filter this warning, check for finite (and positive) values instead
                 warnings.filterwarnings(
@@ -248,59 +1097,405 @@ class LifetimeAnalyzer:
                     # do not set bounds as this can make it harder to spot invalid fits
                     # bounds=(0, np.inf),
                 )
-            self.lifetime = LifetimeResult(*fit, *np.sqrt(np.diag(cov)))
+            return LifetimeResult(*fit, *np.sqrt(np.diag(cov)))
         except (RuntimeError, TypeError):
             # RuntimeError: fit did not converge
             # TypeError: fewer datapoints than fit parameters
-            self.lifetime = LifetimeResult(np.nan, np.nan, np.nan, np.nan)
+            return LifetimeResult(np.nan, np.nan, np.nan, np.nan)
 
-    def calc_lifetime_bootstrap(self, n_boot, rng=None):
-        if rng is None or isinstance(rng, int):
-            rng = np.random.default_rng(rng)
+    def calc_lifetime_bootstrap(
+        self,
+        n_boot,
+        rng=None,
+        engine="array",
+        n_jobs=1,
+        executor=None,
+        chunk_size=100,
+        rtol=None,
+    ):
+        """Calculate lifetime and its error via bootstrapping
 
-        # filter before resampling
-        track_stats = {
-            intv: t[t["track_len"] >= self.min_track_length]
-            for intv, t in concat_stats(self.track_stats).items()
-        }
-        blt = []
-        for _ in range(n_boot):
-            ana = copy.copy(self)
-            tstats_samp = {
-                intv: ts.sample(
-                    frac=1.0, replace=True, ignore_index=True, random_state=rng
+        Track statistics are resampled with replacement for each recording interval,
+        apparent lifetimes are calculated from each sample and :py:meth:`lifetime_model`
+        is fit. Results are stored in :py:attr:`apparent_lifetimes`,
+        :py:attr:`lifetime`, and :py:attr:`bootstrap_replicates`.
+
+        Parameters
+        ----------
+        n_boot
+            Number of bootstrap replicates
+        rng
+            Random number generator or seed
+        engine
+            If ``"array"``, draw the number of times each unique
+            ``(track_len, censored)`` pair occurs in a replicate for all replicates at
+            once and fit weighted data. If ``"dataframe"``, resample track statistics
+            DataFrames one replicate at a time. Both draw from the same distribution,
+            but the former is considerably faster and requires less memory. The
+            latter requires :py:attr:`track_stats` to be DataFrames. Versions up to
+            2.1.1 always resampled DataFrames, so results for a given `rng` differ
+            from those, but agree within statistical error.
+        n_jobs
+            Number of worker processes for the ``"array"`` engine. If less than 1,
+            use all CPUs. Ignored if `executor` is given.
+        executor
+            Executor to run chunks of replicates for the ``"array"`` engine. If
+            `None`, a :py:class:`concurrent.futures.ProcessPoolExecutor` is
+            created if `n_jobs` is not 1.
+        chunk_size
+            Number of replicates per chunk for the ``"array"`` engine. Each chunk
+            draws from its own random stream spawned from `rng` via
+            :py:meth:`numpy.random.SeedSequence.spawn`. Thus results only depend on
+            `rng` and `chunk_size`, not on the number of workers.
+        rtol
+            If given, use the ``"array"`` engine adaptively: Compute chunks of
+            replicates until the standard errors of lifetime and bleaching constant
+            change by less than `rtol` (relative) and the fraction of outliers by less
+            than `rtol` (absolute) when adding a chunk. `n_boot` is the maximum number
+            of replicates. The number of replicates used is stored in
+            :py:attr:`bootstrap_n_replicates`.
+
+        If :py:attr:`result_cache` is set, `engine` is "array", and `rng` is an
+        integer seed, results are cached. Since they do not depend on the number of
+        workers, `n_jobs` and `executor` are not part of the cache key. Results of
+        the "dataframe" engine also depend on the order of tracks and are not
+        cached.
+        """
+        if rtol is not None and engine != "array":
+            raise ValueError('adaptive bootstrapping requires the "array" engine')
+
+        key = None
+        if (
+            self.result_cache is not None
+            and engine == "array"
+            and isinstance(rng, (int, np.integer))
+        ):
+            key = self._result_cache_key(
+                kind="bootstrap",
+                n_boot=n_boot,
+                seed=int(rng),
+                engine=engine,
+                chunk_size=chunk_size,
+                rtol=rtol,
+            )
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                self._set_bootstrap_results(
+                    cached["interval"],
+                    cached["track_count"],
+                    BootstrapReplicates(cached["lifetime_app"], cached["lifetime"]),
                 )
-                for intv, ts in track_stats.items()
+                return
+
+        if engine == "array":
+            with ExitStack() as stack:
+                if executor is None and n_jobs != 1:
+                    executor = stack.enter_context(
+                        concurrent.futures.ProcessPoolExecutor(
+                            n_jobs if n_jobs >= 1 else None
+                        )
+                    )
+                if executor is None:
+                    chunks_per_round = 1
+                elif n_jobs >= 1:
+                    chunks_per_round = n_jobs
+                else:
+                    chunks_per_round = os.cpu_count() or 1
+                intervals, track_count, reps = self._bootstrap_arrays(
+                    self.get_track_length_histogram(truncate=True),
+                    n_boot,
+                    rng,
+                    chunk_size,
+                    executor,
+                    rtol,
+                    chunks_per_round,
+                )
+        elif engine == "dataframe":
+            if rng is None or isinstance(rng, int):
+                rng = np.random.default_rng(rng)
+            # filter before resampling
+            track_stats = {
+                intv: t[t["track_len"] >= self.min_track_length]
+                for intv, t in self.get_filtered_stats().items()
             }
-            ana.track_stats = tstats_samp
-            ana.calc_apparent_lifetimes()
-            ana.calc_lifetime()
-            blt.append(ana)
+            intervals, track_count, reps = self._bootstrap_dataframes(
+                track_stats, n_boot, rng
+            )
+        else:
+            raise ValueError('engine needs to be "array" or "dataframe"')
 
-        alt = np.array([b.apparent_lifetimes["lifetime_app"].to_numpy() for b in blt])
+        self._set_bootstrap_results(intervals, track_count, reps)
+        if key is not None:
+            self.result_cache.put(
+                key,
+                {
+                    "interval": intervals,
+                    "track_count": track_count,
+                    "lifetime_app": reps.lifetime_app,
+                    "lifetime": reps.lifetime,
+                },
+            )
+
+    def _set_bootstrap_results(
+        self,
+        intervals: np.ndarray,
+        track_count: np.ndarray,
+        reps: BootstrapReplicates,
+    ):
+        """Set attributes from bootstrap replicates
+
+        Parameters
+        ----------
+        intervals
+            Recording intervals
+        track_count
+            Number of tracks for each entry of `intervals`
+        reps
+            Replicates
+        """
+        alt = reps.lifetime_app
         self.apparent_lifetimes = pd.DataFrame(
             {
-                "interval": blt[0].apparent_lifetimes["interval"].to_numpy(),
+                "interval": intervals,
                 "lifetime_app": alt.mean(axis=0),
                 "lifetime_app_err": alt.std(axis=0, ddof=1),
-                "track_count": blt[0].apparent_lifetimes["track_count"].to_numpy(),
+                "track_count": track_count,
             }
         )
-        lt = np.array([(b.lifetime.lifetime, b.lifetime.bleach) for b in blt])
+        self.bootstrap_replicates = reps
+        self.bootstrap_n_replicates = len(reps.lifetime)
+        self.lifetime, self.bootstrap_n_outliers = self._summarize_bootstrap(
+            reps.lifetime
+        )
 
+    @staticmethod
+    def _summarize_bootstrap(lt: np.ndarray) -> Tuple[LifetimeResult, int]:
+        """Compute lifetime and its error from bootstrap replicates
+
+        Parameters
+        ----------
+        lt
+            One ``(t_on, c_bleach)`` pair per row
+
+        Returns
+        -------
+        Mean and standard deviation of replicates, excluding outliers, and number of
+        outliers
+        """
         # remove outliers
         low_pct, high_pct = np.nanquantile(lt, [0.25, 0.75])
         iqr = high_pct - low_pct
         is_not_outlier = (lt[:, 0] > 0) & (lt[:, 0] < high_pct + 20 * iqr)
         lt = lt[is_not_outlier, :]
 
-        self.lifetime = LifetimeResult(
+        res = LifetimeResult(
             lt[:, 0].mean(),
             lt[:, 1].mean(),
             lt[:, 0].std(ddof=1),
             lt[:, 1].std(ddof=1),
         )
-        self.bootstrap_n_outliers = len(is_not_outlier) - is_not_outlier.sum()
+        return res, len(is_not_outlier) - is_not_outlier.sum()
+
+    def _bootstrap_dataframes(
+        self,
+        track_stats: Mapping[Any, pd.DataFrame],
+        n_boot: int,
+        rng: np.random.Generator,
+    ) -> Tuple[np.ndarray, np.ndarray, BootstrapReplicates]:
+        """Bootstrap by resampling track statistics DataFrames
+
+        Parameters
+        ----------
+        track_stats
+            Maps recording interval -> filtered track statistics
+        n_boot
+            Number of bootstrap replicates
+        rng
+            Random number generator
+
+        Returns
+        -------
+        Recording intervals, track count for each interval, and replicates
+        """
+        blt = []
+        for _ in range(n_boot):
+            ana = copy.copy(self)
+            ana.result_cache = None
+            tstats_samp = {
+                intv: ts.sample(
+                    frac=1.0, replace=True, ignore_index=True, random_state=rng
+                )
+                for intv, ts in track_stats.items()
+            }
+            ana.track_stats = tstats_samp
+            ana.calc_apparent_lifetimes()
+            ana.calc_lifetime()
+            blt.append(ana)
+
+        alt = np.array([b.apparent_lifetimes["lifetime_app"].to_numpy() for b in blt])
+        lt = np.array([(b.lifetime.lifetime, b.lifetime.bleach) for b in blt])
+        return (
+            blt[0].apparent_lifetimes["interval"].to_numpy(),
+            blt[0].apparent_lifetimes["track_count"].to_numpy(),
+            BootstrapReplicates(alt, lt),
+        )
+
+    def _bootstrap_arrays(
+        self,
+        hist: TrackLengthHistogram,
+        n_boot: int,
+        rng: np.random.Generator | int | None,
+        chunk_size: int,
+        executor: Optional[concurrent.futures.Executor] = None,
+        rtol: Optional[float] = None,
+        chunks_per_round: int = 1,
+    ) -> Tuple[np.ndarray, np.ndarray, BootstrapReplicates]:
+        """Bootstrap by drawing multinomial counts of unique track lengths
+
+        Resampling ``n`` tracks with replacement is equivalent to drawing from a
+        multinomial distribution how often each track is picked. Since tracks
+        only differ by ``(track_len, censored)``, it is sufficient to do so for
+        unique pairs. Apparent lifetimes of all replicates are computed at once
+        using :py:func:`fit_censored_exponential`.
+
+        Parameters
+        ----------
+        hist
+            Counts of filtered tracks at least :py:attr:`min_track_length` long
+        n_boot
+            Number of bootstrap replicates
+        rng
+            Random number generator or seed
+        chunk_size
+            Number of replicates drawn from the same random stream
+        executor
+            Used to compute chunks in parallel. If `None`, run serially.
+        rtol
+            If not `None`, stop early when results are stable. See
+            :py:meth:`calc_lifetime_bootstrap`.
+        chunks_per_round
+            If stopping early, submit this many chunks to `executor` at once.
+            Convergence is still checked after each chunk (in order), so this
+            does not affect results.
+
+        Returns
+        -------
+        Recording intervals, track count for each interval, and replicates
+        """
+        keys = sorted(hist, key=float)
+        intervals = np.array([float(k) for k in keys], dtype=float)
+        track_count = np.array([hist[k].count.sum() for k in keys], dtype=int)
+        samples = [hist[k] for k in keys]
+
+        n_chunks = -(-n_boot // chunk_size)
+        sizes = [min(chunk_size, n_boot - i * chunk_size) for i in range(n_chunks)]
+        if isinstance(rng, np.random.Generator):
+            seed_seq = rng.bit_generator.seed_seq
+        else:
+            seed_seq = np.random.SeedSequence(rng)
+        params = {
+            "min_track_length": self.min_track_length,
+            "min_track_count": self.min_track_count,
+            "max_init_bleach": self.max_init_bleach,
+            "max_init_lifetime": self.max_init_lifetime,
+            "filter_columns": self.filter_columns,
+        }
+        run = map if executor is None else executor.map
+
+        def run_chunks(sz):
+            # Spawning successively yields the same seeds as spawning all at once
+            seeds = seed_seq.spawn(len(sz))
+            n = len(sz)
+            return run(
+                _bootstrap_chunk,
+                [params] * n,
+                [intervals] * n,
+                [track_count] * n,
+                [samples] * n,
+                sz,
+                seeds,
+            )
+
+        if rtol is None:
+            chunks = list(run_chunks(sizes))
+        else:
+            chunks = []
+            prev = None
+            converged = False
+            while sizes and not converged:
+                todo = sizes[:chunks_per_round]
+                sizes = sizes[chunks_per_round:]
+                for c in run_chunks(todo):
+                    chunks.append(c)
+                    lt = np.concatenate([c.lifetime for c in chunks])
+                    res, n_out = self._summarize_bootstrap(lt)
+                    cur = np.array([res.lifetime_err, res.bleach_err])
+                    frac = n_out / len(lt)
+                    if prev is not None and (
+                        np.all(np.abs(cur - prev[0]) <= rtol * np.abs(prev[0]))
+                        and abs(frac - prev[1]) <= rtol
+                    ):
+                        # discard chunks computed in parallel beyond this one
+                        converged = True
+                        break
+                    prev = cur, frac
+
+        reps = BootstrapReplicates(
+            np.concatenate([c.lifetime_app for c in chunks]),
+            np.concatenate([c.lifetime for c in chunks]),
+        )
+        return intervals, track_count, reps
+
+    def _bootstrap_replicates(
+        self,
+        intervals: np.ndarray,
+        track_count: np.ndarray,
+        samples: Iterable[TrackLengthCounts],
+        n_boot: int,
+        rng: np.random.Generator,
+    ) -> BootstrapReplicates:
+        """Draw and evaluate bootstrap replicates
+
+        Parameters
+        ----------
+        intervals
+            Recording intervals
+        track_count
+            Number of tracks for each entry of `intervals`
+        samples
+            For each entry of `intervals`, track counts. Tracks shorter than
+            :py:attr:`min_track_length` need to be removed beforehand.
+        n_boot
+            Number of bootstrap replicates
+        rng
+            Random number generator
+
+        Returns
+        -------
+        Replicates
+        """
+        alt = np.empty((n_boot, len(intervals)))
+        alt_err = np.empty_like(alt)
+        for i, (intv, n, (count, cens, counts)) in enumerate(
+            zip(intervals, track_count, samples)
+        ):
+            if n > 0:
+                weights = rng.multinomial(n, counts / n, size=n_boot)
+            else:
+                weights = np.zeros((n_boot, 0), dtype=np.int64)
+            alt[:, i], alt_err[:, i], _ = self._fit_apparent_lifetime(
+                count, cens, intv, weights
+            )
+
+        lt = np.empty((n_boot, 2))
+        count_ok = track_count >= self.min_track_count
+        for b in range(n_boot):
+            valid = count_ok & np.isfinite(alt[b]) & np.isfinite(alt_err[b])
+            res = self._fit_lifetime_model(
+                intervals[valid], alt[b, valid], alt_err[b, valid]
+            )
+            lt[b] = res.lifetime, res.bleach
+        return BootstrapReplicates(alt, lt)
 
     def prepare_apparent_lifetimes(self) -> pd.DataFrame:
         apparent = self.apparent_lifetimes
@@ -313,13 +1508,13 @@ class LifetimeAnalyzer:
         return apparent[valid].copy()
 
     def get_censor_stats(self) -> pd.DataFrame:
-        tstats = {
-            intv: t[t["track_len"] >= self.min_track_length]
-            for intv, t in concat_stats(self.track_stats).items()
-        }
+        hist = self.get_track_length_histogram(truncate=True)
         return pd.DataFrame(
-            [np.bincount(t["censored"], minlength=4) for t in tstats.values()],
-            index=[float(intv) for intv in tstats.keys()],
+            [
+                np.bincount(c.censored, weights=c.count, minlength=4).astype(int)
+                for c in hist.values()
+            ],
+            index=[float(intv) for intv in hist.keys()],
         ).sort_index()
 
     def plot(
@@ -418,13 +1613,301 @@ class LifetimeAnalyzer:
         ax.set_ylabel("average track count")
 
     @classmethod
-    def load(cls, yaml_path, convert_interval=float, n_frames={}):
+    def load(
+        cls,
+        yaml_path,
+        convert_interval=float,
+        n_frames={},
+        result_cache=None,
+        filter_columns=["filter_param", "filter_manual"],
+    ):
+        """Create analyzer from a save file
+
+        Parameters
+        ----------
+        yaml_path, convert_interval, n_frames
+            Passed to :py:func:`io.load_data`
+        result_cache
+            Set :py:attr:`result_cache`
+        filter_columns
+            Only tracks where all of these columns are 0 are used. See
+            :py:func:`apply_filters`.
+
+        Returns
+        -------
+        Analyzer whose :py:attr:`track_stats` only contain the "track_len",
+        "censored", and `filter_columns` columns
+        """
         from .io import load_data
 
-        md, _, track_stats = load_data(yaml_path, convert_interval, n_frames=n_frames)
+        # Only track stats are needed, which are much smaller than localizations
+        md, _, track_stats = load_data(
+            yaml_path,
+            convert_interval,
+            n_frames=n_frames,
+            lazy=True,
+            loc=False,
+            stats_columns=["track_len", "censored", *filter_columns],
+        )
         kwargs = {}
         with suppress(KeyError):
             kwargs["min_track_length"] = md["filter_options"]["min_length"]
         with suppress(KeyError):
             kwargs["min_track_count"] = md["fit_options"]["min_count"]
-        return cls(track_stats, **kwargs)
+        return cls(
+            track_stats,
+            filter_columns=filter_columns,
+            result_cache=result_cache,
+            **kwargs,
+        )
+
+
+def _bootstrap_chunk(
+    params: Mapping[str, Any],
+    intervals: np.ndarray,
+    track_count: np.ndarray,
+    samples: Iterable[TrackLengthCounts],
+    n_boot: int,
+    seed: np.random.SeedSequence,
+) -> BootstrapReplicates:
+    """Compute a chunk of bootstrap replicates
+
+    This is a module-level function so that it can be run in worker processes. See
+    :py:meth:`LifetimeAnalyzer._bootstrap_replicates` for a description of parameters.
+    `params` are passed to :py:class:`LifetimeAnalyzer`.
+    """
+    ana = LifetimeAnalyzer(None, **params)
+    return ana._bootstrap_replicates(
+        intervals, track_count, samples, n_boot, np.random.default_rng(seed)
+    )
+
+
+def fit_lifetime_model_batch(
+    intervals: np.ndarray,
+    app_lt: np.ndarray,
+    errors: Optional[np.ndarray] = None,
+    valid: Optional[np.ndarray] = None,
+    max_init_bleach: float = 1e3,
+    max_init_lifetime: float = 1e7,
+    max_iter: int = 200,
+    rtol: float = 1.5e-8,
+) -> np.ndarray:
+    """Fit :py:meth:`LifetimeAnalyzer.lifetime_model` to many datasets at once
+
+    Uses the Levenberg–Marquardt algorithm with analytic Jacobian, vectorized over
+    datasets. Initial guesses and handling of errors are the same as in
+    :py:meth:`LifetimeAnalyzer.calc_lifetime`.
+
+    Parameters
+    ----------
+    intervals, app_lt
+        Recording intervals and apparent lifetimes. 2D arrays, one row per dataset.
+        Rows may be padded with arbitrary values; see `valid`.
+    errors
+        Standard errors of apparent lifetimes. If given, residuals are weighted and
+        errors of fit parameters are absolute. Rows consisting of NaNs only are
+        treated like unweighted fits.
+    valid
+        Which entries to use. If `None`, use all finite entries.
+    max_init_bleach, max_init_lifetime
+        Bounds for initial guesses. See :py:class:`LifetimeAnalyzer`.
+    max_iter
+        Maximum number of iterations
+    rtol
+        Stop if the relative change of all parameters is less than this
+
+    Returns
+    -------
+    One row per dataset with lifetime, bleaching constant, and their standard
+    errors. NaN for datasets with fewer than two data points or where the fit did
+    not converge.
+    """
+    intervals = np.atleast_2d(np.asarray(intervals, dtype=float))
+    app_lt = np.atleast_2d(np.asarray(app_lt, dtype=float))
+    if errors is None:
+        absolute = np.zeros(len(app_lt), dtype=bool)
+        errors = np.ones_like(app_lt)
+    else:
+        errors = np.atleast_2d(np.asarray(errors, dtype=float))
+        absolute = ~np.all(np.isnan(errors), axis=1)
+        errors = np.where(absolute[:, None], errors, 1.0)
+    if valid is None:
+        valid = np.isfinite(intervals) & np.isfinite(app_lt) & np.isfinite(errors)
+    valid = valid & (errors > 0)
+    n_points = valid.sum(axis=1)
+    x = np.where(valid, intervals, 1.0)
+    y = np.where(valid, app_lt, 1.0)
+    w = np.where(valid, 1 / errors, 0.0)
+
+    # initial guesses via linear regression of 1 / app_lt vs. 1 / intervals
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv_x = 1 / x
+        inv_y = 1 / y
+        mean_x = (inv_x * valid).sum(axis=1) / n_points
+        mean_y = (inv_y * valid).sum(axis=1) / n_points
+        dx = (inv_x - mean_x[:, None]) * valid
+        k_bleach_init = (dx * (inv_y - mean_y[:, None])).sum(axis=1) / (dx**2).sum(
+            axis=1
+        )
+        k_off_init = mean_y - k_bleach_init * mean_x
+        t_on = 1 / np.maximum(k_off_init, 1 / max_init_lifetime)
+        c_bleach = 1 / np.maximum(k_bleach_init, 1 / max_init_bleach)
+
+    def residuals(t_on, c_bleach):
+        f = LifetimeAnalyzer.lifetime_model(x, t_on[:, None], c_bleach[:, None])
+        return f, (y - f) * w
+
+    def chi_sq(res):
+        ret = (res**2).sum(axis=1)
+        return np.where(np.isfinite(ret), ret, np.inf)
+
+    active = n_points >= 2
+    converged = np.zeros_like(active)
+    lam = np.full(len(app_lt), 1e-3)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        f, res = residuals(t_on, c_bleach)
+        chi = chi_sq(res)
+        for _ in range(max_iter):
+            if not np.any(active):
+                break
+            # analytic Jacobian of residuals (up to sign) w.r.t. parameters
+            j_t = f**2 / t_on[:, None] ** 2 * w
+            j_c = f**2 / (c_bleach[:, None] ** 2 * x) * w
+            a11 = (j_t**2).sum(axis=1)
+            a12 = (j_t * j_c).sum(axis=1)
+            a22 = (j_c**2).sum(axis=1)
+            g1 = (j_t * res).sum(axis=1)
+            g2 = (j_c * res).sum(axis=1)
+            d11 = a11 * (1 + lam)
+            d22 = a22 * (1 + lam)
+            det = d11 * d22 - a12**2
+            step_t = (d22 * g1 - a12 * g2) / det
+            step_c = (d11 * g2 - a12 * g1) / det
+            new_t = np.where(active, t_on + step_t, t_on)
+            new_c = np.where(active, c_bleach + step_c, c_bleach)
+            new_f, new_res = residuals(new_t, new_c)
+            new_chi = chi_sq(new_res)
+
+            accept = active & (new_chi <= chi)
+            small = (np.abs(step_t) <= rtol * np.abs(t_on)) & (
+                np.abs(step_c) <= rtol * np.abs(c_bleach)
+            )
+            t_on = np.where(accept, new_t, t_on)
+            c_bleach = np.where(accept, new_c, c_bleach)
+            f = np.where(accept[:, None], new_f, f)
+            res = np.where(accept[:, None], new_res, res)
+            chi = np.where(accept, new_chi, chi)
+            lam = np.where(accept, lam / 10, lam * 10)
+
+            done = active & ((accept & small) | (chi == 0) | (lam > 1e16))
+            converged |= done & np.isfinite(t_on) & np.isfinite(c_bleach)
+            active &= ~done
+
+        # covariance from Jacobian at the optimum
+        j_t = f**2 / t_on[:, None] ** 2 * w
+        j_c = f**2 / (c_bleach[:, None] ** 2 * x) * w
+        a11 = (j_t**2).sum(axis=1)
+        a12 = (j_t * j_c).sum(axis=1)
+        a22 = (j_c**2).sum(axis=1)
+        det = a11 * a22 - a12**2
+        var_t = a22 / det
+        var_c = a11 / det
+        scale = np.where(absolute, 1.0, chi / (n_points - 2))
+        t_on_err = np.sqrt(var_t * scale)
+        c_bleach_err = np.sqrt(var_c * scale)
+
+    ret = np.column_stack([t_on, c_bleach, t_on_err, c_bleach_err])
+    ret[~converged] = np.nan
+    return ret
+
+
+def fit_lifetimes(
+    data: (
+        Mapping[Any, LifetimeAnalyzer | pd.DataFrame]
+        | Iterable[LifetimeAnalyzer | pd.DataFrame]
+    ),
+    min_track_count: int = 10,
+    max_init_bleach: float = 1e3,
+    max_init_lifetime: float = 1e7,
+) -> pd.DataFrame:
+    """Fit lifetimes of many conditions at once
+
+    Uses :py:func:`fit_lifetime_model_batch`, which is much faster than calling
+    :py:meth:`LifetimeAnalyzer.calc_lifetime` in a loop.
+
+    Parameters
+    ----------
+    data
+        Maps condition -> analyzer or apparent lifetime table. If not a mapping,
+        conditions are numbered consecutively. For analyzers,
+        :py:meth:`LifetimeAnalyzer.calc_apparent_lifetimes` is called if
+        necessary and analyzers' parameters are used. Tables need to have
+        "interval" and "lifetime_app" columns; "lifetime_app_err" and
+        "track_count" are optional (see :py:attr:`LifetimeAnalyzer.apparent_lifetimes`).
+    min_track_count, max_init_bleach, max_init_lifetime
+        Parameters used for apparent lifetime tables. See
+        :py:class:`LifetimeAnalyzer`.
+
+    Returns
+    -------
+    One line per condition. Columns are the fields of :py:class:`LifetimeResult`.
+    """
+    if not isinstance(data, Mapping):
+        data = dict(enumerate(data))
+
+    tables = []
+    max_init = []
+    for d in data.values():
+        if isinstance(d, LifetimeAnalyzer):
+            if d.apparent_lifetimes is None:
+                d.calc_apparent_lifetimes()
+            min_count = d.min_track_count
+            max_init.append((d.max_init_bleach, d.max_init_lifetime))
+            d = d.apparent_lifetimes
+        else:
+            min_count = min_track_count
+            max_init.append((max_init_bleach, max_init_lifetime))
+        intv = d["interval"].to_numpy(dtype=float)
+        lt = d["lifetime_app"].to_numpy(dtype=float)
+        err = (
+            d["lifetime_app_err"].to_numpy(dtype=float)
+            if "lifetime_app_err" in d
+            else np.full_like(lt, np.nan)
+        )
+        # same as `LifetimeAnalyzer.prepare_apparent_lifetimes`
+        valid = np.isfinite(lt)
+        if "lifetime_app_err" in d:
+            valid &= np.isfinite(err)
+        if "track_count" in d:
+            valid &= d["track_count"].to_numpy() >= min_count
+        tables.append((intv[valid], lt[valid], err[valid]))
+
+    n_cond = len(tables)
+    n_max = max((len(t[0]) for t in tables), default=0)
+    intervals = np.full((n_cond, n_max), np.nan)
+    app_lt = np.full((n_cond, n_max), np.nan)
+    errors = np.full((n_cond, n_max), np.nan)
+    for i, (intv, lt, err) in enumerate(tables):
+        intervals[i, : len(intv)] = intv
+        app_lt[i, : len(intv)] = lt
+        errors[i, : len(intv)] = err
+    valid = np.isfinite(intervals) & np.isfinite(app_lt)
+
+    # Group conditions by initial guess bounds; usually there is only one group
+    res = np.empty((n_cond, 4))
+    max_init = np.array(max_init, dtype=float).reshape(-1, 2)
+    for mi in np.unique(max_init, axis=0):
+        sel = np.all(max_init == mi, axis=1)
+        res[sel] = fit_lifetime_model_batch(
+            intervals[sel],
+            app_lt[sel],
+            errors[sel],
+            valid[sel],
+            max_init_bleach=mi[0],
+            max_init_lifetime=mi[1],
+        )
+    return pd.DataFrame(
+        res,
+        index=pd.Index(list(data.keys()), name="condition"),
+        columns=LifetimeResult._fields,
+    )
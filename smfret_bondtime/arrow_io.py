@@ -0,0 +1,311 @@
+# SPDX-FileCopyrightText: 2024 Lukas Schrangl <lukas.schrangl@boku.ac.at>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Directory-based storage of localization data and track stats in Arrow IPC files
+
+Instead of a single HDF5 file, data is written to a directory next to the YAML save
+file, e.g., ``data.arrow/g1/<interval>/<file id>/loc.arrow`` and
+``.../track_stats.arrow``. Files are uncompressed so that they can be memory-mapped
+and converted to pandas without copying. Unlike HDF5 files, they can be read by
+many processes at once, also while a new version is being saved.
+
+Each save writes a new generation directory (``g1``, ``g2``, …). The YAML file
+references the current one via its "arrow_dir" entry; replacing the YAML file
+makes a save visible. The previous generation is kept so that readers which
+loaded the old YAML file can continue; older ones are removed.
+
+Requires pyarrow. Use via :py:func:`io.save_data` and :py:func:`io.load_data`.
+"""
+
+import collections
+import contextlib
+import os
+import re
+import shutil
+import warnings
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Tuple
+
+import pandas as pd
+from sdt import io
+
+loc_name = "loc.arrow"
+stats_name = "track_stats.arrow"
+
+
+def arrow_root(yaml_path: Path) -> Path:
+    """Directory containing generation directories of a save file"""
+    return yaml_path.with_suffix(".arrow")
+
+
+def write_arrow(path: str | Path, data: pd.DataFrame):
+    """Write DataFrame to an uncompressed Arrow IPC file
+
+    Parameters
+    ----------
+    path
+        Output file
+    data
+        Data to write. The index is stored unless it is a
+        :py:class:`pandas.RangeIndex`.
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(data)
+    with pa.OSFile(str(path), "wb") as f, pa.ipc.new_file(f, table.schema) as w:
+        w.write_table(table)
+
+
+def read_arrow(
+    path: str | Path, columns: Iterable[str] | None = None, copy: bool = False
+) -> pd.DataFrame:
+    """Read DataFrame from an Arrow IPC file
+
+    The file is memory-mapped. Unless `copy` is `True`, columns without missing
+    values are not copied, so only parts of the file that are actually accessed
+    are read from disk. Such columns are read-only.
+
+    Parameters
+    ----------
+    path
+        File to read
+    columns
+        Only read these columns (if present). The index is always read.
+    copy
+        Copy data into writable memory.
+
+    Returns
+    -------
+    Data read from `path`
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(str(path)) as mm:
+        table = pa.ipc.open_file(mm).read_all()
+    if columns is not None:
+        pd_meta = table.schema.pandas_metadata or {}
+        index_cols = [c for c in pd_meta.get("index_columns", []) if isinstance(c, str)]
+        columns = set(columns)
+        table = table.select(
+            [c for c in table.column_names if c in columns or c in index_cols]
+        )
+    ret = table.to_pandas(split_blocks=True)
+    if copy:
+        ret = ret.copy()
+    return ret
+
+
+class LazyArrowMapping(collections.abc.Mapping):
+    """Read-only mapping of DataFrames which are read from Arrow files on demand
+
+    Each value is read when first accessed and kept in memory afterwards.
+
+    Parameters
+    ----------
+    files
+        Map of key -> Arrow IPC file
+    columns, copy
+        Passed to :py:func:`read_arrow`.
+    """
+
+    def __init__(
+        self,
+        files: Mapping[Any, str | Path],
+        columns: Iterable[str] | None = None,
+        copy: bool = False,
+    ):
+        self._files = {k: Path(f) for k, f in files.items()}
+        self._columns = None if columns is None else list(columns)
+        self._copy = copy
+        self._data = {}
+
+    def __getitem__(self, key: Any) -> pd.DataFrame:
+        try:
+            return self._data[key]
+        except KeyError:
+            pass
+        ret = self._data[key] = read_arrow(
+            self._files[key], self._columns, self._copy
+        )
+        return ret
+
+    def __iter__(self):
+        return iter(self._files)
+
+    def __len__(self):
+        return len(self._files)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._files!r})"
+
+    def load(self) -> Dict[Any, pd.DataFrame]:
+        """Read all data
+
+        Returns
+        -------
+        Map of key -> DataFrame
+        """
+        return {k: self[k] for k in self._files}
+
+
+def _generation(d: Path) -> int:
+    m = re.fullmatch(r"g(\d+)", d.name)
+    return int(m.group(1)) if m is not None else -1
+
+
+def save_data_arrow(
+    yaml_path: Path,
+    metadata: Dict[str, Any],
+    loc_data: Mapping[Any, Mapping[Any, pd.DataFrame | None]],
+    track_stats: Mapping[Any, Mapping[Any, pd.DataFrame | None]],
+    modified: Iterable[Tuple[Any, Any]] | None = None,
+):
+    """Save data using Arrow IPC files
+
+    Called by :py:func:`io.save_data`, which prepares `metadata`.
+
+    Parameters
+    ----------
+    yaml_path, metadata, loc_data, track_stats
+        See :py:func:`io.save_data`.
+    modified
+        (experiment id, file id) pairs whose localization data changed since the
+        save file was written or loaded. Localization data of other files is
+        hard-linked from the current generation directory. If `None`, write
+        everything.
+    """
+    root = arrow_root(yaml_path)
+    old_dir = None
+    with contextlib.suppress(Exception):
+        with yaml_path.open() as yf:
+            old = io.yaml.safe_load(yf)
+        if old.get("storage_backend") == "arrow":
+            old_dir = yaml_path.parent / old["arrow_dir"]
+    if modified is not None and (old_dir is None or not old_dir.is_dir()):
+        modified = None
+    modified = None if modified is None else set(modified)
+
+    root.mkdir(exist_ok=True)
+    gens = [d for d in root.iterdir() if _generation(d) >= 0]
+    new_dir = root / f"g{max(map(_generation, gens), default=0) + 1}"
+    tmp_yaml_path = yaml_path.with_suffix(".tmp.yaml")
+
+    try:
+        new_dir.mkdir()
+        for ekey, dset in loc_data.items():
+            for dkey, ld in dset.items():
+                if not isinstance(ld, pd.DataFrame):
+                    warnings.warn(
+                        f"no localization data for dataset {ekey}, file {dkey}"
+                    )
+                    continue
+                d = new_dir / str(ekey) / str(dkey)
+                d.mkdir(parents=True, exist_ok=True)
+                if modified is not None and (ekey, dkey) not in modified:
+                    src = old_dir / str(ekey) / str(dkey) / loc_name
+                    if src.exists():
+                        try:
+                            os.link(src, d / loc_name)
+                        except OSError:
+                            shutil.copy2(src, d / loc_name)
+                        continue
+                write_arrow(d / loc_name, ld)
+        for ekey, dset in track_stats.items():
+            for dkey, ts in dset.items():
+                if not isinstance(ts, pd.DataFrame):
+                    warnings.warn(
+                        f"no track stats data for dataset {ekey}, file {dkey}"
+                    )
+                    continue
+                d = new_dir / str(ekey) / str(dkey)
+                d.mkdir(parents=True, exist_ok=True)
+                write_arrow(d / stats_name, ts)
+
+        metadata["arrow_dir"] = new_dir.relative_to(yaml_path.parent).as_posix()
+        with tmp_yaml_path.open("w") as yf:
+            io.yaml.safe_dump(metadata, yf)
+        tmp_yaml_path.replace(yaml_path)
+    except BaseException:
+        shutil.rmtree(new_dir, ignore_errors=True)
+        raise
+    finally:
+        tmp_yaml_path.unlink(missing_ok=True)
+
+    # Keep the previous generation for concurrent readers
+    keep = {new_dir.name}
+    if old_dir is not None:
+        keep.add(old_dir.name)
+    for d in gens:
+        if d.name not in keep:
+            shutil.rmtree(d, ignore_errors=True)
+
+
+def load_data_arrow(
+    yaml_path: Path,
+    yaml_data: Dict[str, Any],
+    lazy: bool = False,
+    loc: bool = True,
+    stats_columns: Iterable[str] | None = None,
+) -> Tuple[Dict, Dict, Dict]:
+    """Load data saved using Arrow IPC files
+
+    Called by :py:func:`io.load_data`.
+
+    If `lazy`, localization data is not copied from memory-mapped files and
+    therefore read-only, and so are track stats if `stats_columns` is given.
+    Otherwise, all data is copied into writable memory and files are closed, as
+    when reading HDF5 files.
+
+    Parameters
+    ----------
+    yaml_path
+        YAML save file
+    yaml_data
+        Contents of `yaml_path`, with special datasets removed if requested
+    lazy, loc
+        See :py:func:`io.load_data`.
+    stats_columns
+        Only read these columns of track stats (if present).
+
+    Returns
+    -------
+    Metadata, map of recording interval -> file id -> localization data, map of
+    recording interval -> file id -> track statistics
+    """
+    from .io import special_keys
+
+    data_dir = yaml_path.parent / yaml_data.pop("arrow_dir")
+    tracks = {}
+    track_stats = {}
+    for interval, dset in yaml_data["files"].items():
+        if interval in special_keys:
+            continue
+        loc_files = {}
+        stats_files = {}
+        for dkey, dfiles in dset.items():
+            d = data_dir / str(interval) / str(dkey)
+            for name, files, what in (
+                (loc_name, loc_files, "localization data"),
+                (stats_name, stats_files, "track statistics"),
+            ):
+                if name == loc_name and not loc:
+                    continue
+                if (d / name).exists():
+                    files[dkey] = d / name
+                else:
+                    warnings.warn(
+                        f"{what} not found for interval {interval},"
+                        f" file {dfiles.get('source_0', f'id {dkey}')}"
+                    )
+        if loc:
+            tracks[interval] = LazyArrowMapping(loc_files, copy=not lazy)
+        track_stats[interval] = LazyArrowMapping(
+            stats_files, stats_columns, copy=not lazy or stats_columns is None
+        )
+
+    if not lazy:
+        tracks = {k: v.load() for k, v in tracks.items()}
+        track_stats = {k: v.load() for k, v in track_stats.items()}
+
+    return yaml_data, tracks, track_stats
@@ -135,14 +135,15 @@ T.Changepoints {
             }
         }
 
-        Sdt.BatchWorker {
+        ParallelBatchWorker {
             id: batchWorker
             anchors.fill: parent
             dataset: root.datasets
             argRoles: ["locData", "trackStats"]
             resultRoles: ["locData", "trackStats"]
             displayRole: "source_0"
-            errorPolicy: Sdt.BatchWorker.ErrorPolicy.Abort
+            nJobs: backend.batchJobs
+            errorPolicy: T.ParallelBatchWorker.ErrorPolicy.Abort
         }
 
         onRejected: { batchWorker.abort() }
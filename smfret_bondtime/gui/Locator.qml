@@ -6,6 +6,7 @@ import QtQuick
 import QtQuick.Controls
 import QtQuick.Layouts
 import SdtGui as Sdt
+import SmFretBondTime.Templates as T
 
 
 Item {
@@ -57,14 +58,15 @@ Item {
             }
         }
 
-        Sdt.BatchWorker {
+        ParallelBatchWorker {
             id: batchWorker
             anchors.fill: parent
             dataset: root.datasets
             argRoles: root.datasets.fileRoles
             resultRoles: ["locData"]
             displayRole: root.datasets.fileRoles[0]
-            errorPolicy: Sdt.BatchWorker.ErrorPolicy.Abort
+            nJobs: backend.batchJobs
+            errorPolicy: T.ParallelBatchWorker.ErrorPolicy.Abort
         }
 
         onRejected: { batchWorker.abort() }
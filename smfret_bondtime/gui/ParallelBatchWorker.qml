@@ -0,0 +1,55 @@
+// SPDX-FileCopyrightText: 2024 Lukas Schrangl <lukas.schrangl@boku.ac.at>
+//
+// SPDX-License-Identifier: BSD-3-Clause
+
+import QtQuick
+import QtQuick.Controls
+import QtQuick.Layouts
+import SmFretBondTime.Templates as T
+
+
+T.ParallelBatchWorker {
+    id: root
+
+    implicitWidth: rootLayout.implicitWidth
+    implicitHeight: rootLayout.implicitHeight
+
+    ColumnLayout {
+        id: rootLayout
+        anchors.fill: parent
+
+        ProgressBar {
+            id: pBar
+            to: root.count
+            value: root.progress
+            Layout.fillWidth: true
+        }
+        Label {
+            text: {
+                var ret = "Processed " + root.progress + " of " + root.count + "…"
+                var ci = root._currentItem
+                ci ? ret + "\n(" + ci + ")" : ret
+            }
+            visible: root.isRunning
+        }
+        Label {
+            text: {
+                var it = root._errorList.length > 1 ? "items" : "item"
+                var ret = "Errors encountered in " + it + "\n"
+                return ret + root._errorList.join("\n")
+            }
+            visible: root._errorList.length
+        }
+        Label {
+            text: "Finished."
+            visible: (!root.isRunning &&
+                      (root.errorPolicy == T.ParallelBatchWorker.ErrorPolicy.Continue ||
+                       !root._errorList.length))
+        }
+        Label {
+            text: "Aborted."
+            visible: (root.errorPolicy == T.ParallelBatchWorker.ErrorPolicy.Abort &&
+                      root._errorList.length)
+        }
+    }
+}
@@ -16,6 +16,9 @@ T.Results {
     readonly property Item resultsFig: resultsFig
     property alias minCount: minCountBox.value
     property alias nBoot: nBootBox.value
+    property alias adaptiveBoot: adaptiveBootSwitch.checked
+    property alias bootTolerance: bootToleranceBox.value
+    property alias nJobs: nJobsBox.value
     property int randomSeed: genRandomSeed()
 
     implicitWidth: rootLayout.implicitWidth
@@ -40,16 +43,50 @@ T.Results {
                 Layout.alignment: Qt.AlignRight
             }
             Label {
-                text: "bootstrap runs"
+                text: root.adaptiveBoot ? "max. bootstrap runs" : "bootstrap runs"
             }
             Sdt.EditableSpinBox {
                 id: nBootBox
                 from: 1
-                to: 9999
+                to: 99999
                 value: 1
                 Layout.columnSpan: 2
                 Layout.alignment: Qt.AlignRight
             }
+            Switch {
+                id: adaptiveBootSwitch
+                text: "stop when converged"
+                enabled: root.nBoot > 1
+                Layout.columnSpan: 3
+            }
+            Label {
+                text: "rel. tolerance"
+                enabled: root.nBoot > 1 && root.adaptiveBoot
+            }
+            Sdt.RealSpinBox {
+                id: bootToleranceBox
+                from: 0
+                to: 1
+                decimals: 3
+                stepSize: 0.005
+                value: 0.01
+                enabled: root.nBoot > 1 && root.adaptiveBoot
+                Layout.columnSpan: 2
+                Layout.alignment: Qt.AlignRight
+            }
+            Label {
+                text: "worker processes"
+                enabled: root.nBoot > 1
+            }
+            Sdt.EditableSpinBox {
+                id: nJobsBox
+                from: 1
+                to: 999
+                value: root.cpuCount()
+                enabled: root.nBoot > 1
+                Layout.columnSpan: 2
+                Layout.alignment: Qt.AlignRight
+            }
             Label {
                 text: "random seed"
                 enabled: root.nBoot > 1
@@ -76,6 +113,11 @@ T.Results {
                     root.calculate()
                 }
             }
+            Label {
+                text: root.bootstrapInfo
+                visible: root.bootstrapInfo !== ""
+                Layout.columnSpan: 3
+            }
             Item {
                 height: 5
                 Layout.columnSpan: 3
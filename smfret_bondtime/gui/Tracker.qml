@@ -6,6 +6,7 @@ import QtQuick
 import QtQuick.Controls
 import QtQuick.Layouts
 import SdtGui as Sdt
+import SmFretBondTime.Templates as T
 
 
 Item {
@@ -78,12 +79,13 @@ Item {
             }
         }
 
-        Sdt.BatchWorker {
+        ParallelBatchWorker {
             id: trackBatchWorker
             anchors.fill: parent
             dataset: root.datasets
             argRoles: ["locData", ...root.datasets.fileRoles]
             resultRoles: ["locData", "trackStats"]
+            nJobs: backend.batchJobs
         }
 
         onRejected: { trackBatchWorker.abort() }
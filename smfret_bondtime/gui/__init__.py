@@ -11,6 +11,7 @@ import matplotlib as mpl
 from sdt import gui
 
 from .backend import Backend
+from .batch_worker import ParallelBatchWorker
 from .changepoints import Changepoints
 from .filter import Filter
 from .image_pipeline import LifetimeImagePipeline
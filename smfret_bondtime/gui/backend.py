@@ -3,16 +3,16 @@
 # SPDX-License-Identifier: BSD-3-Clause
 
 import contextlib
+import os
 from pathlib import Path
+import weakref
 
-import numpy as np
 import pandas as pd
-import trackpy
 from PySide6 import QtCore, QtQml
-from sdt import brightness, changepoint, gui, helper, io, loc, multicolor, spatial
+from sdt import gui, multicolor
 
-from ..analysis import calc_track_stats
-from ..io import load_data, save_data, special_keys
+from .. import pipeline
+from ..io import file_version, load_data, save_data, special_keys
 
 
 class Backend(QtCore.QObject):
@@ -32,7 +32,15 @@ class Backend(QtCore.QObject):
         self._fitOptions = {}
         self._changepointOptions = {}
         self._saveFile = QtCore.QUrl()
+        self._locStorage = {}
+        self._storageBackend = "hdf5"
+        self._batchJobs = os.cpu_count() or 1
         self._imagePipeline = None
+        # Localization data as in the save file, used to find out what needs to be
+        # written on incremental save. Map of (interval, file id) -> weakref or
+        # `None` if unknown.
+        self._savedLoc = None
+        self._savedLocPending = None
 
         self._wrk = gui.ThreadWorker(self._workerDispatch)
         self._wrk.finished.connect(self._wrkFinishedOk)
@@ -51,6 +59,11 @@ class Backend(QtCore.QObject):
     fitOptions = gui.SimpleQtProperty("QVariantMap")
     changepointOptions = gui.SimpleQtProperty("QVariantMap")
     saveFile = gui.SimpleQtProperty(QtCore.QUrl)
+    locStorage = gui.SimpleQtProperty("QVariantMap")
+    storageBackend = gui.SimpleQtProperty(str)
+    # Number of worker processes for batch processing; not saved as it depends on
+    # the machine
+    batchJobs = gui.SimpleQtProperty(int)
     imagePipeline = gui.SimpleQtProperty("QVariant")
 
     registrationDatasetChanged = QtCore.Signal()
@@ -128,7 +141,7 @@ class Backend(QtCore.QObject):
                         entry[srcName] = Path(p).relative_to(dd).as_posix()
 
         data = {
-            "file_version": 3,
+            "file_version": file_version,
             "channels": self.imagePipeline.channels,
             "data_dir": self.dataDir,
             "excitation_seq": self.imagePipeline.excitationSeq,
@@ -142,10 +155,29 @@ class Backend(QtCore.QObject):
             "filter_options": self.filterOptions,
             "changepoint_options": self.changepointOptions,
             "fit_options": self.fitOptions,
+            "loc_storage": self.locStorage,
+            "storage_backend": self.storageBackend,
         }
 
+        # Compare localization data to what was saved/loaded last time. Since it is
+        # not modified in place, but replaced, checking identity is sufficient.
+        currentLoc = self._getLocData()
+        if self._savedLoc is not None and yaml_path == Path(
+            self.saveFile.toLocalFile()
+        ):
+            modified = [
+                k
+                for k in currentLoc.keys() | self._savedLoc.keys()
+                if k not in self._savedLoc
+                or k not in currentLoc
+                or self._savedLoc[k]() is not currentLoc[k]
+            ]
+        else:
+            modified = None
+        self._savedLocPending = currentLoc
+
         # write to disk in different thread
-        self._wrk("save", yaml_path, data, self._datasets)
+        self._wrk("save", yaml_path, data, self._datasets, modified)
 
         self.saveFile = QtCore.QUrl.fromLocalFile(str(yaml_path))
 
@@ -177,8 +209,22 @@ class Backend(QtCore.QObject):
 
         return action, ret
 
+    def _getLocData(self):
+        ret = {}
+        for i in range(self._datasets.rowCount()):
+            ekey = self._datasets.get(i, "key")
+            dset = self._datasets.get(i, "dataset")
+            for j in range(dset.rowCount()):
+                ld = dset.get(j, "locData")
+                if isinstance(ld, pd.DataFrame):
+                    ret[ekey, dset.get(j, "id")] = ld
+        return ret
+
+    def _setSavedLoc(self, locData):
+        self._savedLoc = {k: weakref.ref(v) for k, v in locData.items()}
+
     @staticmethod
-    def _saveFunc(yaml_path, yaml_data, datasets):
+    def _saveFunc(yaml_path, yaml_data, datasets, modified=None):
         tracks = {}
         track_stats = {}
         for i in range(datasets.rowCount()):
@@ -193,11 +239,14 @@ class Backend(QtCore.QObject):
                 if isinstance(ts, pd.DataFrame):
                     track_stats.setdefault(ekey, {})[dkey] = ts
 
-        save_data(yaml_path, yaml_data, tracks, track_stats)
+        save_data(yaml_path, yaml_data, tracks, track_stats, modified)
 
     @staticmethod
     def _loadFunc(yaml_path):
-        md, trc, sts = load_data(yaml_path, convert_interval=None, special=True)
+        # Read everything here in the worker thread
+        md, trc, sts = load_data(
+            yaml_path, convert_interval=None, special=True, lazy=False
+        )
         # get full paths
         dd = Path(md["data_dir"])
         for files in md.get("files", {}).values():
@@ -211,6 +260,9 @@ class Backend(QtCore.QObject):
     @QtCore.Slot(object)
     def _wrkFinishedOk(self, result):
         self._wrk.enabled = False
+        if result[0] == "save":
+            self._setSavedLoc(self._savedLocPending)
+            self._savedLocPending = None
         if result[0] != "load":
             return
 
@@ -240,6 +292,10 @@ class Backend(QtCore.QObject):
             self.fitOptions = data["fit_options"]
         if "changepoint_options" in data:
             self.changepointOptions = data["changepoint_options"]
+        if "loc_storage" in data:
+            self.locStorage = data["loc_storage"]
+        if "storage_backend" in data:
+            self.storageBackend = data["storage_backend"]
 
         fl = data.get("files", {})
         if fl:
@@ -259,148 +315,43 @@ class Backend(QtCore.QObject):
                     dset.set(j, "locData", tracks[intv][fid])
                 with contextlib.suppress(KeyError):
                     dset.set(j, "trackStats", trackStats[intv][fid])
+        self._setSavedLoc(self._getLocData())
 
     @QtCore.Slot(object)
     def _wrkFinishedError(self, e):
+        # Save file state is unknown, do a full save next time
+        self._savedLoc = None
+        self._savedLocPending = None
         self._wrkError = str(e)
         self._workerErrorChanged.emit()
         self._wrk.enabled = False
 
     @QtCore.Slot(result="QVariant")
     def getLocateFunc(self):
-        f = getattr(loc, self.locAlgorithm).batch
-        opts = self.locOptions
-
-        def locFunc(*files):
-            try:
-                imgs = {
-                    src: io.ImageSequence(f).open()
-                    for src, f in zip(self.datasets.fileRoles, files)
-                }
-                pipe = self.imagePipeline.processFunc(imgs, "corrAcceptor")
-                lc = f(pipe, **opts)
-                orig_frame_count = pipe.orig_frame_count
-            finally:
-                for i in imgs.values():
-                    i.close()
-            # Since sdt-python 17.1, frame numbers are preserved when using
-            # slices of ImageSequence.
-            lc["frame"] = self.imagePipeline.frameSelector.renumber_frames(
-                lc["frame"].to_numpy(), "d", n_frames=orig_frame_count
-            )
-            return lc
-
-        return locFunc
-
-    def trackExtraFrames(self, trc, nExtra, nFrames):
-        if nExtra <= 0:
-            trc["extra_frame"] = 0
-            return trc
-        trc_s = []
-        for p, t in helper.split_dataframe(trc, "particle", type="DataFrame"):
-            t.sort_values("frame", ignore_index=True, inplace=True)
-            t["extra_frame"] = 0
-            mini = t.loc[0, "frame"]
-            pre = pd.DataFrame(
-                {
-                    "frame": np.arange(max(0, mini - nExtra), mini),
-                    "extra_frame": 1,
-                    "particle": p,
-                    "interp": 1,
-                    "x": t.loc[0, "x"],
-                    "y": t.loc[0, "y"],
-                }
-            )
-            i = t.index[-1]
-            maxi = t.loc[i, "frame"]
-            post = pd.DataFrame(
-                {
-                    "frame": np.arange(maxi + 1, min(maxi + nExtra + 1, nFrames)),
-                    "extra_frame": 2,
-                    "particle": p,
-                    "interp": 1,
-                    "x": t.loc[i, "x"],
-                    "y": t.loc[i, "y"],
-                }
-            )
-            a = pd.concat([pre, t, post], ignore_index=True)
-            trc_s.append(a)
-        return pd.concat(trc_s, ignore_index=True)
+        nFiles = sum(
+            self._datasets.get(i, "dataset").rowCount()
+            for i in range(self._datasets.rowCount())
+            if not self._datasets.get(i, "special")
+        )
+        # If there are fewer files than worker processes, also split each file
+        # into chunks of frames which are localized in parallel
+        return pipeline.LocateStage(
+            self.imagePipeline.getPipeline(),
+            self.locAlgorithm,
+            self.locOptions,
+            self.datasets.fileRoles,
+            max(1, self.batchJobs // max(1, nFiles)),
+        )
 
     @QtCore.Slot(result="QVariant")
     def getTrackFunc(self):
-        opts = self.trackOptions.copy()
-        extra = opts.pop("extra_frames", 0)
-
-        def trackFunc(locData, *files):
-            trackpy.quiet()
-            if locData.empty:
-                trc = locData.copy()
-                # This adds the "particle" column
-                trc["particle"] = 0
-                trc_stats = pd.DataFrame(
-                    columns=["start", "end", "track_len", "censored", "bg", "mass"]
-                )
-            else:
-                if "extra_frame" in locData:
-                    locData = locData[locData["extra_frame"] == 0]
-                locData = locData[~locData["x"].isnull() & ~locData["y"].isnull()]
-                trc = trackpy.link(locData, **opts)
-                trc = spatial.interpolate_coords(trc)
-
-                try:
-                    imgs = {
-                        src: io.ImageSequence(f).open()
-                        for src, f in zip(self.datasets.fileRoles, files)
-                    }
-                    pipe = self.imagePipeline.processFunc(imgs, "corrAcceptor")
-                    trc = self.trackExtraFrames(trc, extra, len(pipe))
-                    brightness.from_raw_image(trc, pipe, radius=3, mask="circle")
-                    trc_stats = calc_track_stats(trc, len(pipe))
-                except Exception:
-                    trc_stats = pd.DataFrame(
-                        columns=["start", "end", "track_len", "censored", "bg", "mass"]
-                    )
-                    raise
-                finally:
-                    for i in imgs.values():
-                        i.close()
-            trc_stats["filter_param"] = -1
-            trc_stats["filter_manual"] = -1
-            return trc, trc_stats
-
-        return trackFunc
-
-    # TODO: this should be in sdt.changepoint.utils
-    @staticmethod
-    def indices_to_segments(indices, length):
-        seg = np.arange(len(indices) + 1)
-        reps = np.diff(indices, prepend=0, append=length)
-        return np.repeat(seg, reps)
+        return pipeline.TrackStage(
+            self.imagePipeline.getPipeline(), self.trackOptions, self.datasets.fileRoles
+        )
 
     @QtCore.Slot(result="QVariant")
     def getChangepointFunc(self):
-        opts = self.changepointOptions
-        cp_det = changepoint.Pelt()
-
-        def changepointFunc(tracks, stats):
-            if len(tracks) < 1:
-                return tracks.copy(), stats.copy()
-            td = tracks.sort_values(["particle", "frame"])
-            st = stats.copy()
-            cps = []
-            st["changepoints"] = -1
-            for p, (idx, mass) in helper.split_dataframe(
-                td, "particle", ["mass"], type="array_list", keep_index=True, sort=False
-            ):
-                c = cp_det.find_changepoints(mass, **opts)
-                s = self.indices_to_segments(c, len(mass))
-                cps.append(pd.Series(s, index=idx))
-                st.loc[p, "changepoints"] = len(c)
-            td["mass_seg"] = pd.concat(cps)
-            return td, st
-
-        return changepointFunc
+        return pipeline.ChangepointStage(self.changepointOptions)
 
 
 QtQml.qmlRegisterType(Backend, "SmFretBondTime", 1, 1, "Backend")
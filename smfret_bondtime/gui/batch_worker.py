@@ -0,0 +1,213 @@
+# SPDX-FileCopyrightText: 2024 Lukas Schrangl <lukas.schrangl@boku.ac.at>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+import concurrent.futures
+import enum
+import logging
+import multiprocessing
+import os
+
+from PySide6 import QtCore, QtQml, QtQuick
+from sdt import gui
+
+_logger = logging.getLogger(__name__)
+
+
+class ParallelBatchWorker(QtQuick.QQuickItem):
+    """Apply a function to each dataset entry using a pool of worker processes
+
+    Drop-in replacement for :py:class:`sdt.gui.BatchWorker` (same properties,
+    error policies, and progress reporting), but up to :py:attr:`nJobs` entries
+    are processed at once. Thus :py:attr:`func`, its arguments, and its return
+    values need to be picklable, e.g., :py:class:`pipeline.LocateStage`. Results
+    are stored as they arrive, which is not necessarily in order.
+    """
+
+    @QtCore.QEnum
+    class ErrorPolicy(enum.IntEnum):
+        Abort = 0
+        Continue = enum.auto()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._dataset = gui.ListModel()
+        self._func = None
+        self._argRoles = []
+        self._kwargRoles = []
+        self._resultRoles = []
+        self._displayRole = ""
+        self._nJobs = os.cpu_count() or 1
+        self._count = -1
+        self._progress = 0
+        self._errorPolicy = self.ErrorPolicy.Abort
+        self._errLst = []
+        self._executor = None
+        self._maxPending = 0
+        # List of (dataset, index) pairs to process
+        self._items = []
+        self._nextItem = 0
+        # Map of item number -> future
+        self._pending = {}
+        # Incremented on abort so that results of old futures are discarded
+        self._generation = 0
+
+        # Futures' callbacks are run in executor threads. Queue the signal to
+        # handle results in the GUI thread.
+        self._itemFinished.connect(
+            self._onItemFinished, QtCore.Qt.ConnectionType.QueuedConnection
+        )
+        app = QtCore.QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.abort)
+
+    dataset = gui.SimpleQtProperty("QVariant")
+    func = gui.SimpleQtProperty("QVariant")
+    argRoles = gui.SimpleQtProperty(list)
+    kwargRoles = gui.SimpleQtProperty(list)
+    resultRoles = gui.SimpleQtProperty(list)
+    displayRole = gui.SimpleQtProperty(str)
+    nJobs = gui.SimpleQtProperty(int)
+    """Number of worker processes. If 1, use a thread instead. If less than 1, use
+    as many processes as there are CPUs.
+    """
+    count = gui.SimpleQtProperty(int, readOnly=True)
+    progress = gui.SimpleQtProperty(int, readOnly=True)
+    errorPolicy = gui.SimpleQtProperty(int)
+
+    _itemFinished = QtCore.Signal(int, int, object)
+    _errorListChanged = QtCore.Signal()
+
+    @QtCore.Property(list, notify=_errorListChanged)
+    def _errorList(self):
+        return self._errLst
+
+    isRunningChanged = QtCore.Signal()
+
+    @QtCore.Property(bool, notify=isRunningChanged)
+    def isRunning(self):
+        return self._executor is not None
+
+    _currentItemChanged = QtCore.Signal()
+
+    @QtCore.Property(str, notify=_currentItemChanged)
+    def _currentItem(self):
+        if not self._pending:
+            return ""
+        return self._itemDisplay(min(self._pending))
+
+    def _itemDisplay(self, i):
+        if not self._displayRole:
+            return ""
+        dset, idx = self._items[i]
+        return str(dset.get(idx, self._displayRole))
+
+    @QtCore.Slot()
+    def start(self):
+        self.abort()
+
+        if isinstance(self._dataset, gui.DatasetCollection):
+            dsets = [
+                self._dataset.get(i, "dataset")
+                for i in range(self._dataset.count)
+                if not self._dataset.get(i, "special")
+            ]
+        else:
+            dsets = [self._dataset]
+        self._items = [(d, j) for d in dsets for j in range(d.rowCount())]
+        self._nextItem = 0
+
+        if self._errLst:
+            self._errLst = []
+            self._errorListChanged.emit()
+        if len(self._items) != self._count:
+            self._count = len(self._items)
+            self.countChanged.emit()
+        if self._progress > 0:
+            self._progress = 0
+            self.progressChanged.emit()
+        if not self._items:
+            return
+
+        n = self._nJobs if self._nJobs >= 1 else (os.cpu_count() or 1)
+        if n == 1:
+            self._executor = concurrent.futures.ThreadPoolExecutor(1)
+        else:
+            # Use processes even if there is only one item since `func` may start
+            # processes itself, which is not safe to do by forking the GUI
+            # process with its running Qt threads.
+            n = min(n, len(self._items))
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                n, mp_context=multiprocessing.get_context("spawn")
+            )
+        self._maxPending = 2 * n
+        self.isRunningChanged.emit()
+        self._submit()
+
+    @QtCore.Slot()
+    def abort(self):
+        """Abort processing
+
+        Entries which are currently processed are finished in the background, but
+        their results are discarded.
+        """
+        self._generation += 1
+        self._pending.clear()
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self.isRunningChanged.emit()
+        self._currentItemChanged.emit()
+
+    def _submit(self):
+        # Keep a few more items than workers queued to avoid idle workers
+        gen = self._generation
+        while (
+            len(self._pending) < self._maxPending and self._nextItem < len(self._items)
+        ):
+            i = self._nextItem
+            self._nextItem += 1
+            dset, idx = self._items[i]
+            args = [dset.get(idx, r) for r in self._argRoles]
+            kwargs = {r: dset.get(idx, r) for r in self._kwargRoles}
+            fut = self._executor.submit(self._func, *args, **kwargs)
+            self._pending[i] = fut
+            fut.add_done_callback(lambda f, i=i: self._itemFinished.emit(gen, i, f))
+        self._currentItemChanged.emit()
+
+    @QtCore.Slot(int, int, object)
+    def _onItemFinished(self, gen, i, fut):
+        if gen != self._generation or fut.cancelled():
+            return
+        del self._pending[i]
+
+        exc = fut.exception()
+        if exc is None:
+            dset, idx = self._items[i]
+            retval = fut.result()
+            if len(self._resultRoles) == 1:
+                dset.set(idx, self._resultRoles[0], retval)
+            else:
+                for r, v in zip(self._resultRoles, retval):
+                    dset.set(idx, r, v)
+        else:
+            name = self._itemDisplay(i) or i + 1
+            _logger.error("failed to process %s", name, exc_info=exc)
+            self._errLst.append(name)
+            self._errorListChanged.emit()
+            if self._errorPolicy != self.ErrorPolicy.Continue:
+                self.abort()
+                return
+
+        self._progress += 1
+        self.progressChanged.emit()
+        if self._progress < self._count:
+            self._submit()
+        else:
+            self.abort()
+
+
+QtQml.qmlRegisterType(
+    ParallelBatchWorker, "SmFretBondTime.Templates", 1, 1, "ParallelBatchWorker"
+)
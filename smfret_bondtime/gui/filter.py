@@ -9,6 +9,8 @@ from PySide6 import QtCore, QtQml
 import numpy as np
 from sdt import changepoint, gui
 
+from ..pipeline import filter_tracks
+
 
 # TODO: No need to derive from OptionChooser since there are no intensive
 # tasks that need to be done in a thread
@@ -146,23 +148,15 @@ class Filter(gui.OptionChooser):
     ):
         if trackStats is None or trackData is None:
             return None, None
-        flt = np.zeros(len(trackStats), dtype=bool)
-        if bgThresh > 0:
-            flt |= trackStats["bg"] >= bgThresh
-        if massThresh > 0:
-            flt |= trackStats["mass"] <= massThresh
-        if minLength > 1:
-            flt |= trackStats["track_len"] < minLength
-        if "changepoints" in trackStats:
-            cp = trackStats["changepoints"].to_numpy(copy=True)
-            if startEndChangepoints:
-                cp += trackStats["censored"] & 1
-                cp += trackStats["censored"] & 2
-            flt |= cp < minChangepoints
-            flt |= cp > maxChangepoints
-        trackStats["filter_param"] = flt.astype(int)
-
-        fp = trackStats["filter_param"] == 0
+        fp = filter_tracks(
+            trackStats,
+            bg_thresh=bgThresh,
+            mass_thresh=massThresh,
+            min_length=minLength,
+            min_changepoints=minChangepoints,
+            max_changepoints=maxChangepoints,
+            start_end_changepoints=startEndChangepoints,
+        )
         msk = trackData["particle"].isin(fp.index[fp])
         return trackData[msk], trackData[~msk]
 
@@ -4,18 +4,21 @@
 
 import contextlib
 import math
+from pathlib import Path
 from typing import Dict
 
 from PySide6 import QtCore, QtQml
-import numpy as np
-import scipy.ndimage
-from sdt import gui, helper, multicolor
+from sdt import gui, multicolor
+
+from ..memmap import open_memmap
+from ..pipeline import ImagePipeline, default_bleed_through
+from ..prefetch import PrefetchSequence
 
 
 class LifetimeImagePipeline(gui.BasicImagePipeline):
     def __init__(self, parent: QtCore.QObject = None):
         super().__init__(parent)
-        self._bleedThrough = {"background": 200.0, "factor": 0.0, "smooth": 1.0}
+        self._bleedThrough = default_bleed_through.copy()
         self._channels = {
             "donor": {"roi": None, "source": "source_0"},
             "acceptor": {"roi": None, "source": "source_0"},
@@ -23,6 +26,9 @@ class LifetimeImagePipeline(gui.BasicImagePipeline):
         self.frameSelector = multicolor.FrameSelector("")
         self._registrator = multicolor.Registrator()
         self._registrator.channel_names = list(self.channels)
+        # Map of source name -> (opened image sequence, MemmapSequence or
+        # PrefetchSequence wrapping it)
+        self._wrappedSeqs = {}
 
         self.bleedThroughChanged.connect(self._doProcessIfCorrAcceptor)
         self.channelsChanged.connect(self.doProcess)
@@ -68,44 +74,30 @@ class LifetimeImagePipeline(gui.BasicImagePipeline):
         if self.currentChannel == "corrAcceptor":
             self.doProcess()
 
+    def getPipeline(self) -> ImagePipeline:
+        """Get GUI-independent image pipeline using current settings"""
+        return ImagePipeline(
+            self._channels, self._registrator, self._bleedThrough, self.excitationSeq
+        )
+
     def processFunc(self, imageSeqs, channel):
-        if channel in ("donor", "acceptor"):
-            ch = self._channels.get(channel, {})
-            r = ch.get("roi")
-            s = ch.get("source")
-            if s is not None:
-                seq = imageSeqs.get(s)
-            if r is not None:
-                seq = r(seq)
-            if channel == "donor":
-                seq = self._registrator(
-                    seq, channel="donor", cval=self._bleedThrough["background"]
-                )
-
-            # Remember frame count. Necessary to adjust frame numbers after
-            # localization in slices. See `Backend.getLocateFunc`.
-            cnt = len(seq)
-
-            if seq is not None:
-                seq = self.frameSelector.select(seq, "d")
-
-            seq.orig_frame_count = cnt
-            return seq
-        if channel.startswith("corrAcceptor"):
-            d = self.processFunc(imageSeqs, "donor")
-            a = self.processFunc(imageSeqs, "acceptor")
-            bg = self._bleedThrough["background"]
-            bt = self._bleedThrough["factor"]
-            smt = self._bleedThrough["smooth"]
-
-            def corr(donor, acceptor):
-                noBg = np.asanyarray(donor, dtype=float) - bg
-                if smt >= 1e-3:
-                    noBg = scipy.ndimage.gaussian_filter(noBg, smt)
-                return acceptor - noBg * bt
-
-            seq = helper.Pipeline(corr, d, a, propagate_attrs={"orig_frame_count"})
-            return seq
+        # Memory-map uncompressed TIFF files. Otherwise, read frames following
+        # the currently displayed one in the background. Image sequences are
+        # replaced (and the old ones closed) when opening other files; recreate
+        # wrappers then.
+        for k in list(self._wrappedSeqs):
+            if self._wrappedSeqs[k][0] is not imageSeqs.get(k):
+                self._wrappedSeqs.pop(k)[1].close()
+        for k, v in imageSeqs.items():
+            if k not in self._wrappedSeqs:
+                uri = getattr(v, "uri", None)
+                w = open_memmap(uri) if isinstance(uri, (str, Path)) else None
+                if w is None:
+                    w = PrefetchSequence(v)
+                self._wrappedSeqs[k] = (v, w)
+        return self.getPipeline().process(
+            {k: w for k, (_, w) in self._wrappedSeqs.items()}, channel
+        )
 
 
 QtQml.qmlRegisterType(
@@ -55,6 +55,16 @@ ApplicationWindow {
                 }
             }
             ToolSeparator {}
+            Label { text: "processes" }
+            SpinBox {
+                from: 1
+                to: 256
+                value: backend.batchJobs
+                onValueModified: { backend.batchJobs = value }
+                ToolTip.text: "Number of worker processes for batch processing"
+                ToolTip.visible: hovered
+            }
+            ToolSeparator {}
             TabBar {
                 id: actionTab
                 Layout.fillWidth: true
@@ -455,6 +465,8 @@ ApplicationWindow {
         fitOptions:{
             "min_track_count": results.minCount,
             "n_boot": results.nBoot,
+            "adaptive_boot": results.adaptiveBoot,
+            "boot_tolerance": results.bootTolerance,
             "random_seed": results.randomSeed
         }
         onFitOptionsChanged: {
@@ -463,6 +475,10 @@ ApplicationWindow {
                 results.minCount = o.min_track_count
             if (o.n_boot != undefined)
                 results.nBoot = o.n_boot
+            if (o.adaptive_boot != undefined)
+                results.adaptiveBoot = o.adaptive_boot
+            if (o.boot_tolerance != undefined)
+                results.bootTolerance = o.boot_tolerance
             if (o.random_seed != undefined)
                 results.randomSeed = o.random_seed
         }
@@ -476,6 +492,11 @@ ApplicationWindow {
         property int width: 640
         property int height: 400
     }
+    Settings {
+        id: batchSettings
+        category: "Batch"
+        property int jobs: 0
+    }
     Dialog {
         id: workerDialog
         anchors.centerIn: Overlay.overlay
@@ -544,10 +565,13 @@ ApplicationWindow {
     Component.onCompleted: {
         width = settings.width
         height = settings.height
+        if (batchSettings.jobs > 0)
+            backend.batchJobs = batchSettings.jobs
     }
     onClosing: {
         loc.previewEnabled = false
         settings.setValue("width", width)
         settings.setValue("height", height)
+        batchSettings.setValue("jobs", backend.batchJobs)
     }
 }
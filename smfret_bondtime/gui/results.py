@@ -2,6 +2,9 @@
 #
 # SPDX-License-Identifier: BSD-3-Clause
 
+import concurrent.futures
+import multiprocessing
+import os
 import random
 
 import pandas as pd
@@ -17,6 +20,9 @@ class Results(QtQuick.QQuickItem):
     minLength = gui.SimpleQtProperty(int)
     minCount = gui.QmlDefinedProperty()
     nBoot = gui.QmlDefinedProperty()
+    adaptiveBoot = gui.QmlDefinedProperty()
+    bootTolerance = gui.QmlDefinedProperty()
+    nJobs = gui.QmlDefinedProperty()
     randomSeed = gui.QmlDefinedProperty()
 
     def __init__(self, parent=None):
@@ -26,6 +32,9 @@ class Results(QtQuick.QQuickItem):
         self._minLength = 1
         self._calcError = ""
         self._analyzer = None
+        # Pool of worker processes for bootstrapping, kept across calculations
+        self._executor = None
+        self._executorJobs = 0
 
         self._wrk = gui.ThreadWorker(self._workerDispatch)
         self._wrk.finished.connect(self._wrkFinishedOk)
@@ -33,6 +42,10 @@ class Results(QtQuick.QQuickItem):
 
         self._wrkError = ""
 
+        app = QtCore.QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self._shutdownExecutor)
+
     @QtCore.Property(QtCore.QObject, constant=True)
     def _worker(self):
         return self._wrk
@@ -43,6 +56,18 @@ class Results(QtQuick.QQuickItem):
     def resultAvailable(self):
         return self._analyzer is not None
 
+    bootstrapInfoChanged = QtCore.Signal()
+
+    @QtCore.Property(str, notify=bootstrapInfoChanged)
+    def bootstrapInfo(self):
+        a = self._analyzer
+        if a is None or not a.bootstrap_n_replicates:
+            return ""
+        return (
+            f"{a.bootstrap_n_replicates} bootstrap runs, "
+            f"{a.bootstrap_n_outliers} outliers"
+        )
+
     _workerErrorChanged = QtCore.Signal()
 
     @QtCore.Property(str, notify=_workerErrorChanged)
@@ -54,6 +79,33 @@ class Results(QtQuick.QQuickItem):
         # at least on Windows only 32 bit can be used
         return random.randint(0, 1 << 32 - 1)
 
+    @QtCore.Slot(result=int)
+    def cpuCount(self):
+        return os.cpu_count() or 1
+
+    def _getExecutor(self, nJobs):
+        """Get pool of `nJobs` worker processes, creating it if necessary
+
+        Processes are spawned since forking the GUI process with its running Qt
+        threads is not safe.
+        """
+        if nJobs == 1 or self.nBoot < 2:
+            return None
+        if self._executor is None or self._executorJobs != nJobs:
+            self._shutdownExecutor()
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                nJobs if nJobs >= 1 else None,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            self._executorJobs = nJobs
+        return self._executor
+
+    @QtCore.Slot()
+    def _shutdownExecutor(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
     @QtCore.Slot()
     def calculate(self):
         if self._wrkError:
@@ -68,6 +120,9 @@ class Results(QtQuick.QQuickItem):
             self.minCount,
             self.nBoot,
             self.randomSeed,
+            self.nJobs,
+            self.bootTolerance if self.adaptiveBoot else None,
+            self._getExecutor(self.nJobs),
         )
 
     @QtCore.Slot(QtCore.QUrl, str)
@@ -108,7 +163,17 @@ class Results(QtQuick.QQuickItem):
         return action, ret
 
     @staticmethod
-    def _calcFunc(datasets, fig, minLength, minCount, nBoot, randomSeed):
+    def _calcFunc(
+        datasets,
+        fig,
+        minLength,
+        minCount,
+        nBoot,
+        randomSeed,
+        nJobs=1,
+        bootRtol=None,
+        executor=None,
+    ):
         if datasets is None:
             return
 
@@ -129,7 +194,9 @@ class Results(QtQuick.QQuickItem):
         if nBoot < 2:
             ana.calc_lifetime()
         else:
-            ana.calc_lifetime_bootstrap(nBoot, randomSeed)
+            ana.calc_lifetime_bootstrap(
+                nBoot, randomSeed, n_jobs=nJobs, executor=executor, rtol=bootRtol
+            )
 
         if not fig.axes:
             fig.add_subplot(1, 2, 1)
@@ -173,6 +240,7 @@ class Results(QtQuick.QQuickItem):
             self._analyzer = result[1]
             if not a:
                 self.resultAvailableChanged.emit()
+            self.bootstrapInfoChanged.emit()
 
     @QtCore.Slot(object)
     def _wrkFinishedError(self, exc):
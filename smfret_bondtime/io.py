@@ -3,20 +3,167 @@
 # SPDX-License-Identifier: BSD-3-Clause
 
 import collections
+import concurrent.futures
 import contextlib
 import copy
+import json
 import math
 import re
+import shutil
+import threading
 import warnings
 from pathlib import Path
-from typing import Any, Dict, Mapping
+from typing import Any, Dict, Iterable, Iterator, Mapping, Tuple
 
+import numpy as np
 import pandas as pd
 from sdt import io, multicolor
 
-from .analysis import calc_track_stats
+from .analysis import calc_track_stats, calc_track_stats_chunked
 
 special_keys = ["registration"]
+file_version = 4
+"""Current save file version"""
+default_loc_storage = {"format": "fixed", "complib": "blosc:zstd", "complevel": 0}
+"""Default storage options for localization data, see :py:func:`save_data`"""
+
+
+def probe_n_frames(path: str | Path) -> int:
+    """Get the number of frames in an image file without decoding pixel data
+
+    For TIFF files, only metadata is read. ImageJ files which store the number of
+    images in their description are handled without parsing all image file
+    directories. Other formats are opened using :py:class:`sdt.io.ImageSequence`.
+
+    Parameters
+    ----------
+    path
+        Image file
+
+    Returns
+    -------
+    Number of frames
+    """
+    path = Path(path)
+    if path.suffix.lower() in (".tif", ".tiff"):
+        with contextlib.suppress(ImportError):
+            import tifffile
+
+            with tifffile.TiffFile(path) as tf:
+                ij = tf.imagej_metadata
+                if ij and "images" in ij:
+                    return int(ij["images"])
+                return len(tf.pages)
+    with io.ImageSequence(path) as ims:
+        return len(ims)
+
+
+class FrameCountCache:
+    """Persistent cache of numbers of frames in image files
+
+    Entries are keyed by file path and are invalidated if the file's size or
+    modification time changes. The cache is stored as a JSON file.
+
+    Parameters
+    ----------
+    path
+        Cache file. If `None`, the cache is not persistent.
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = None if path is None else Path(path)
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._modified = False
+        if self.path is not None:
+            with contextlib.suppress(OSError, ValueError):
+                with self.path.open() as f:
+                    self._entries = json.load(f)
+
+    def get(self, path: str | Path) -> int:
+        """Get number of frames in an image file
+
+        Use cached value if possible, otherwise read file metadata.
+
+        Parameters
+        ----------
+        path
+            Image file
+
+        Returns
+        -------
+        Number of frames
+        """
+        path = Path(path)
+        st = path.stat()
+        key = str(path.resolve())
+        with self._lock:
+            e = self._entries.get(key)
+        if (
+            e is not None
+            and e["size"] == st.st_size
+            and e["mtime_ns"] == st.st_mtime_ns
+        ):
+            return e["n_frames"]
+        n = probe_n_frames(path)
+        with self._lock:
+            self._entries[key] = {
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "n_frames": n,
+            }
+            self._modified = True
+        return n
+
+    def get_many(
+        self, paths: Iterable[str | Path], n_workers: int | None = None
+    ) -> Dict[Path, int | Exception]:
+        """Get numbers of frames of multiple image files in parallel
+
+        Since this is dominated by I/O latency (e.g., on network storage), threads
+        are used.
+
+        Parameters
+        ----------
+        paths
+            Image files
+        n_workers
+            Number of threads. If `None`, use the default of
+            :py:class:`concurrent.futures.ThreadPoolExecutor`.
+
+        Returns
+        -------
+        Map of path -> number of frames. If the number could not be determined,
+        the exception raised is stored instead.
+        """
+        paths = list(dict.fromkeys(Path(p) for p in paths))
+        if not paths:
+            return {}
+        ret = {}
+        with concurrent.futures.ThreadPoolExecutor(n_workers) as ex:
+            futs = {p: ex.submit(self.get, p) for p in paths}
+            for p, f in futs.items():
+                exc = f.exception()
+                ret[p] = f.result() if exc is None else exc
+        return ret
+
+    def save(self):
+        """Write cache file if there were changes
+
+        Errors (e.g., if the directory is read-only) are ignored.
+        """
+        if self.path is None or not self._modified:
+            return
+        tmp_path = self.path.with_suffix(".tmp.json")
+        try:
+            with tmp_path.open("w") as f:
+                json.dump(self._entries, f)
+            tmp_path.replace(self.path)
+            self._modified = False
+        except OSError:
+            pass
+        finally:
+            tmp_path.unlink(missing_ok=True)
 
 
 def save_data(
@@ -24,13 +171,24 @@ def save_data(
     metadata: Dict[str, Any],
     loc_data: Mapping[Any, Mapping[Any, pd.DataFrame | None]],
     track_stats: Mapping[Any, Mapping[Any, pd.DataFrame | None]],
+    modified: Iterable[Tuple[Any, Any]] | None = None,
+    max_overlays: int = 8,
+    loc_storage: Mapping[str, Any] | None = None,
+    backend: str | None = None,
 ):
     """Save metadata, single-molecule localizations and track statistics
 
     Metadata is written to `yaml_path`, localizations and track stats are written
-    to a HDF5 file of the same name, but with suffix ".h5". Within the HDF5 file, the
-    `loc` and `track_stats` underneatch /<dataset id>/<file id>/ contain localization
-    data and track stats, respectively.
+    to a HDF5 file of the same name, but with suffix ".h5". Within the HDF5 file,
+    the `loc` nodes underneath /<dataset id>/<file id>/ contain localization data.
+    Track stats of all files are stored in a single table `/track_stats` (see
+    :py:func:`read_track_stats`).
+
+    If `modified` is given, only localization data of these files is written to a
+    new overlay HDF5 file (e.g., ``data.ovl1.h5``) together with all track stats,
+    which are small. Existing HDF5 files are not changed; the overlay is only
+    used once the YAML file listing it has been replaced. Thus, as with a full
+    save, an interrupted save leaves the previous state intact.
 
     Parameters
     ----------
@@ -44,39 +202,98 @@ def save_data(
         Mapping of experiment id -> file id -> single-molecule localization data
     tracks
         Mapping of experiment id -> file id -> track statistics (one track per line)
+    modified
+        (experiment id, file id) pairs whose localization data changed since the
+        save file at `yaml_path` was written or loaded. If `None` or if an
+        incremental save is not possible (e.g., the file does not exist or is of
+        an older version), write everything.
+    max_overlays
+        If an incremental save would result in more than this many overlay files,
+        write everything instead.
+    loc_storage
+        How to store localization data. Dict with keys "format" ("fixed" or
+        "table"), "complib" (compression library, e.g., "blosc:zstd", see
+        :py:class:`tables.Filters`), and "complevel" (0–9, 0 disables compression).
+        Compression is applied to the whole HDF5 file.
+        In "table" format, "particle" and "frame" are indexed data columns,
+        allowing for reading only selected tracks or frames (see
+        :py:func:`select_loc`). Missing keys are taken from
+        :py:data:`default_loc_storage`. If `None`, use the "loc_storage" entry of
+        `metadata`, if present. Settings are recorded in the YAML file as
+        "loc_storage". Only used by the "hdf5" backend.
+    backend
+        Either "hdf5" or "arrow". The latter writes one uncompressed Arrow IPC
+        file per dataset to a directory next to `yaml_path`, which can be
+        memory-mapped and read concurrently by several processes (see
+        :py:mod:`smfret_bondtime.arrow_io`; requires pyarrow). If `None`, use the
+        "storage_backend" entry of `metadata`, defaulting to "hdf5". The backend
+        is recorded in the YAML file as "storage_backend".
     """
     metadata = copy.deepcopy(metadata)
-    metadata["file_version"] = 3
+    metadata["file_version"] = file_version
+    metadata.pop("h5_overlays", None)
+    metadata.pop("arrow_dir", None)
+    if backend is None:
+        backend = metadata.get("storage_backend", "hdf5")
+    if backend not in ("hdf5", "arrow"):
+        raise ValueError(f"unsupported storage backend {backend!r}")
+    metadata["storage_backend"] = backend
+    if loc_storage is None:
+        loc_storage = metadata.get("loc_storage", {})
+    loc_storage = _check_loc_storage(loc_storage)
+    metadata["loc_storage"] = loc_storage
 
     yaml_path = Path(yaml_path)
     tmp_yaml_path = yaml_path.with_suffix(".tmp.yaml")
     h5_path = yaml_path.with_suffix(".h5")
     tmp_h5_path = yaml_path.with_suffix(".tmp.h5")
 
+    if backend == "arrow":
+        from .arrow_io import save_data_arrow
+
+        save_data_arrow(yaml_path, metadata, loc_data, track_stats, modified)
+        # HDF5 files of a previous save are not referenced anymore
+        for p in h5_path, *_overlay_paths(yaml_path):
+            p.unlink(missing_ok=True)
+        return
+
+    old_overlays = _get_overlays(yaml_path)
+    if (
+        modified is not None
+        and old_overlays is not None
+        and len(old_overlays) < max_overlays
+        and h5_path.exists()
+    ):
+        _save_overlay(
+            yaml_path,
+            metadata,
+            loc_data,
+            track_stats,
+            modified,
+            old_overlays,
+            loc_storage,
+        )
+        return
+
     try:
         with tmp_yaml_path.open("w") as yf:
             io.yaml.safe_dump(metadata, yf)
 
         import tables
 
-        with pd.HDFStore(tmp_h5_path, "w") as s, warnings.catch_warnings():
+        with pd.HDFStore(
+            tmp_h5_path, "w", **_store_filters(loc_storage)
+        ) as s, warnings.catch_warnings():
             warnings.simplefilter("ignore", tables.NaturalNameWarning)
             for ekey, dset in loc_data.items():
                 for dkey, ld in dset.items():
                     if isinstance(ld, pd.DataFrame):
-                        s.put(f"/{ekey}/{dkey}/loc", ld)
+                        _put_loc(s, f"/{ekey}/{dkey}/loc", ld, loc_storage)
                     else:
                         warnings.warn(
                             f"no localization data for dataset {ekey}, file {dkey}"
                         )
-            for ekey, dset in track_stats.items():
-                for dkey, ts in dset.items():
-                    if isinstance(ts, pd.DataFrame):
-                        s.put(f"/{ekey}/{dkey}/track_stats", ts)
-                    else:
-                        warnings.warn(
-                            f"no track stats data for dataset {ekey}, file {dkey}"
-                        )
+            _write_track_stats_table(s, track_stats)
 
         tmp_yaml_path.replace(yaml_path)
         tmp_h5_path.replace(h5_path)
@@ -84,8 +301,440 @@ def save_data(
         tmp_yaml_path.unlink(missing_ok=True)
         tmp_h5_path.unlink(missing_ok=True)
 
+    # Overlays are not referenced anymore. Also remove left-overs of interrupted
+    # incremental saves and data of a previous save using the "arrow" backend.
+    for o in _overlay_paths(yaml_path):
+        o.unlink(missing_ok=True)
+    from .arrow_io import arrow_root
+
+    shutil.rmtree(arrow_root(yaml_path), ignore_errors=True)
+
+
+def _get_overlays(yaml_path: Path) -> list | None:
+    """Get list of overlay files from existing save file
+
+    Returns
+    -------
+    List of overlay entries (see :py:func:`_save_overlay`). `None` if the save
+    file does not exist or does not support overlays.
+    """
+    try:
+        with yaml_path.open() as yf:
+            old = io.yaml.safe_load(yf)
+    except Exception:
+        return None
+    if (
+        not isinstance(old, dict)
+        or old.get("file_version", 1) < 4
+        or old.get("storage_backend", "hdf5") != "hdf5"
+    ):
+        return None
+    return old.get("h5_overlays", [])
+
+
+def _overlay_paths(yaml_path: Path) -> list[Path]:
+    """Find overlay HDF5 files belonging to a save file"""
+    pat = re.compile(re.escape(yaml_path.stem) + r"\.ovl\d+\.h5")
+    return [p for p in yaml_path.parent.glob("*.h5") if pat.fullmatch(p.name)]
+
+
+def _save_overlay(
+    yaml_path: Path,
+    metadata: Dict[str, Any],
+    loc_data: Mapping[Any, Mapping[Any, pd.DataFrame | None]],
+    track_stats: Mapping[Any, Mapping[Any, pd.DataFrame | None]],
+    modified: Iterable[Tuple[Any, Any]],
+    overlays: list,
+    loc_storage: Mapping[str, Any],
+):
+    """Write modified data to a new overlay file
+
+    The overlay contains modified localization data and all track stats. It is
+    recorded in the YAML file's "h5_overlays" list as a dict with the file name
+    ("file") and the (experiment id, file id) pairs whose localization data was
+    removed ("removed"). Replacing the YAML file commits the save.
+
+    Parameters
+    ----------
+    yaml_path, metadata, loc_data, track_stats, modified, loc_storage
+        See :py:func:`save_data`
+    overlays
+        Overlays of the existing save file
+    """
+    used = {o["file"] for o in overlays}
+    n = 1
+    for o in used:
+        with contextlib.suppress(AttributeError, ValueError):
+            n = max(n, int(re.search(r"\.ovl(\d+)\.h5$", o).group(1)) + 1)
+    ovl_path = yaml_path.with_suffix(f".ovl{n}.h5")
+    tmp_yaml_path = yaml_path.with_suffix(".tmp.yaml")
+
+    removed = []
+    try:
+        import tables
+
+        # May overwrite left-overs of an interrupted save, which are not referenced
+        with pd.HDFStore(
+            ovl_path, "w", **_store_filters(loc_storage)
+        ) as s, warnings.catch_warnings():
+            warnings.simplefilter("ignore", tables.NaturalNameWarning)
+            for ekey, dkey in modified:
+                ld = loc_data.get(ekey, {}).get(dkey)
+                if isinstance(ld, pd.DataFrame):
+                    _put_loc(s, f"/{ekey}/{dkey}/loc", ld, loc_storage)
+                else:
+                    removed.append([ekey, dkey])
+            _write_track_stats_table(s, track_stats)
+
+        metadata["h5_overlays"] = [
+            *overlays,
+            {"file": ovl_path.name, "removed": removed},
+        ]
+        with tmp_yaml_path.open("w") as yf:
+            io.yaml.safe_dump(metadata, yf)
+        tmp_yaml_path.replace(yaml_path)
+    except BaseException:
+        ovl_path.unlink(missing_ok=True)
+        raise
+    finally:
+        tmp_yaml_path.unlink(missing_ok=True)
+
+
+def _check_loc_storage(opts: Mapping[str, Any]) -> Dict[str, Any]:
+    """Validate localization data storage options and fill in defaults"""
+    ret = {**default_loc_storage, **opts}
+    unknown = ret.keys() - default_loc_storage.keys()
+    if unknown:
+        raise ValueError(f"unknown storage options: {', '.join(sorted(unknown))}")
+    if ret["format"] not in ("fixed", "table"):
+        raise ValueError(f"unsupported storage format {ret['format']!r}")
+    ret["complevel"] = int(ret["complevel"])
+    if not 0 <= ret["complevel"] <= 9:
+        raise ValueError("complevel has to be between 0 and 9")
+    if ret["complib"] is not None:
+        import tables
+
+        if ret["complib"] not in tables.filters.all_complibs:
+            raise ValueError(f"unsupported compression library {ret['complib']!r}")
+    return ret
+
+
+def _store_filters(opts: Mapping[str, Any]) -> Dict[str, Any]:
+    """Get compression arguments for :py:class:`pandas.HDFStore`"""
+    if opts["complevel"] > 0:
+        return {"complevel": opts["complevel"], "complib": opts["complib"]}
+    return {}
+
+
+def _put_loc(
+    store: pd.HDFStore, key: str, data: pd.DataFrame, opts: Mapping[str, Any]
+):
+    """Write localization data according to storage format
+
+    Compression is set when opening `store` (see :py:func:`_store_filters`), as
+    pandas does not support per-node compression for "fixed" format.
+
+    Parameters
+    ----------
+    store
+        HDF5 file
+    key
+        Node name
+    data
+        Localization data
+    opts
+        Storage options, see :py:func:`save_data`
+    """
+    kwargs = {}
+    if opts["format"] == "table":
+        kwargs["data_columns"] = [c for c in ("particle", "frame") if c in data]
+    store.put(key, data, format=opts["format"], **kwargs)
+
+
+def _write_track_stats_table(
+    store: pd.HDFStore,
+    track_stats: Mapping[Any, Mapping[Any, pd.DataFrame | None]],
+):
+    """Write track stats of all files to a single table
+
+    The table is stored as `/track_stats` with additional "interval" and "file"
+    columns, which are indexed for queries. Since columns and dtypes may differ
+    between files (and are lost for files without tracks), they are stored per
+    file as JSON in `/track_stats_layout`.
+
+    Parameters
+    ----------
+    store
+        HDF5 file to write to
+    track_stats
+        Mapping of experiment id -> file id -> track statistics
+    """
+    frames = {}
+    layout = []
+    for ekey, dset in track_stats.items():
+        for dkey, ts in dset.items():
+            if not isinstance(ts, pd.DataFrame):
+                warnings.warn(f"no track stats data for dataset {ekey}, file {dkey}")
+                continue
+            layout.append(
+                {
+                    "interval": str(ekey),
+                    "file": str(dkey),
+                    "layout": json.dumps(
+                        {
+                            "columns": {c: str(t) for c, t in ts.dtypes.items()},
+                            "index": [ts.index.name, str(ts.index.dtype)],
+                        }
+                    ),
+                }
+            )
+            if len(ts):
+                frames[str(ekey), str(dkey)] = ts
+    if not layout:
+        return
+    store.put("/track_stats_layout", pd.DataFrame(layout))
+    if frames:
+        table = pd.concat(frames, names=["interval", "file"])
+        table = table.reset_index(["interval", "file"])
+        store.put(
+            "/track_stats", table, format="table", data_columns=["interval", "file"]
+        )
+
+
+def read_track_stats(
+    h5_path: str | Path | pd.HDFStore,
+    interval: Any | None = None,
+    file: Any | None = None,
+    columns: Iterable[str] | None = None,
+) -> pd.DataFrame:
+    """Read consolidated track statistics table
+
+    Only for save file version >= 4. Selection by `interval` and `file` uses an
+    indexed query and reads only matching rows.
+
+    Parameters
+    ----------
+    h5_path
+        HDF5 file or open store
+    interval, file
+        If given, return only track stats of matching recording interval and/or
+        file id.
+    columns
+        If given, only read these columns (if present) in addition to "interval"
+        and "file".
+
+    Returns
+    -------
+    Track stats of all (selected) files, with additional "interval" and "file"
+    columns containing the respective keys as strings.
+    """
+    where = []
+    if interval is not None:
+        where.append(f"interval == {str(interval)!r}")
+    if file is not None:
+        where.append(f"file == {str(file)!r}")
+    with contextlib.ExitStack() as stack:
+        if isinstance(h5_path, pd.HDFStore):
+            s = h5_path
+        else:
+            s = stack.enter_context(pd.HDFStore(h5_path, "r"))
+        if s.get_node("/track_stats") is None:
+            return pd.DataFrame(
+                {"interval": pd.Series([], dtype=object), "file": []},
+                index=pd.Index([], name="particle"),
+            )
+        if columns is not None:
+            available = s.get_storer("/track_stats").non_index_axes[0][1]
+            columns = set(columns) | {"interval", "file"}
+            columns = [c for c in available if c in columns]
+        return s.select(
+            "/track_stats", where=" & ".join(where) or None, columns=columns
+        )
+
+
+def _split_track_stats_table(
+    store: pd.HDFStore, columns: Iterable[str] | None = None
+) -> Dict[Tuple[str, str], pd.DataFrame]:
+    """Read consolidated track statistics and split them per file
+
+    Parameters
+    ----------
+    store
+        HDF5 file
+    columns
+        If given, only read these columns (if present).
+
+    Returns
+    -------
+    Map of (interval, file id) -> track stats. Keys are strings.
+    """
+    if store.get_node("/track_stats_layout") is None:
+        return {}
+    layout = store.get("/track_stats_layout")
+    table = read_track_stats(store, columns=columns)
+    if columns is not None:
+        columns = set(columns)
+    indices = table.groupby(["interval", "file"], sort=False).indices
+    table = table.drop(columns=["interval", "file"])
+    table_dtypes = {c: str(t) for c, t in table.dtypes.items()}
+    ret = {}
+    for intv, f, lo in layout.itertuples(index=False):
+        lo = json.loads(lo)
+        dtypes = lo["columns"]
+        if columns is not None:
+            dtypes = {c: t for c, t in dtypes.items() if c in columns}
+        idx_name, idx_dtype = lo["index"]
+        try:
+            ts = table.take(indices[intv, f])
+        except KeyError:
+            # no tracks
+            ts = pd.DataFrame(columns=list(dtypes), index=table.index[:0])
+            ts = ts.astype(dtypes)
+        else:
+            if list(dtypes) != list(ts.columns):
+                ts = ts[list(dtypes)]
+            # Columns missing in some files were filled with NaN, changing dtypes
+            cvt = {c: t for c, t in dtypes.items() if table_dtypes.get(c) != t}
+            if cvt:
+                ts = ts.astype(cvt)
+        if str(ts.index.dtype) != idx_dtype:
+            ts.index = ts.index.astype(idx_dtype)
+        ts.index.name = idx_name
+        ret[intv, f] = ts
+    return ret
+
+
+def read_hdf_chunked(
+    store: pd.HDFStore,
+    key: str,
+    chunk_size: int = 1_000_000,
+    columns: list[str] | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Read a DataFrame from a HDF5 file in chunks of rows
+
+    Works for both "fixed" and "table" formats.
+
+    Parameters
+    ----------
+    store
+        HDF5 store to read from
+    key
+        Key of the DataFrame within `store`
+    chunk_size
+        Maximum number of rows per chunk
+    columns
+        Columns to read. Only supported for "table" format, where this reduces the
+        amount of data read; for the "fixed" format, columns are selected after
+        reading.
+
+    Yields
+    ------
+    Consecutive chunks of rows
+    """
+    storer = store.get_storer(key)
+    if storer is None:
+        raise KeyError(key)
+    n_rows = storer.nrows if storer.is_table else storer.shape[0]
+    for start in range(0, max(n_rows, 1), chunk_size):
+        if storer.is_table:
+            yield store.select(
+                key, start=start, stop=start + chunk_size, columns=columns
+            )
+        else:
+            c = store.select(key, start=start, stop=start + chunk_size)
+            yield c if columns is None else c[[k for k in columns if k in c]]
+
+
+def calc_track_stats_hdf(
+    h5_path: str | Path | pd.HDFStore,
+    key: str,
+    n_frames: int,
+    chunk_size: int = 1_000_000,
+) -> pd.DataFrame:
+    """Calculate track statistics from localization data stored in a HDF5 file
+
+    Data is read in chunks of rows, so peak memory usage is determined by
+    `chunk_size` and the number of tracks, not by the size of the data. Results are
+    identical to calling :py:func:`analysis.calc_track_stats` on the whole
+    DataFrame.
+
+    Parameters
+    ----------
+    h5_path
+        HDF5 file or open store
+    key
+        Key of localization data, e.g. ``"/<interval>/<file id>/loc"``
+    n_frames
+        Number of frames in the movie. Used to determine whether tracks are censored.
+    chunk_size
+        Number of rows to read at once
+
+    Returns
+    -------
+    One line per track, see :py:func:`analysis.calc_track_stats`.
+    """
+    columns = ["particle", "frame", "mass", "bg", "extra_frame"]
+    with contextlib.ExitStack() as stack:
+        if isinstance(h5_path, pd.HDFStore):
+            store = h5_path
+        else:
+            store = stack.enter_context(pd.HDFStore(h5_path, "r"))
+        return calc_track_stats_chunked(
+            read_hdf_chunked(store, key, chunk_size, columns), n_frames
+        )
+
+
+def load_data(
+    yaml_path,
+    convert_interval=float,
+    special=False,
+    n_frames={},
+    frame_count_cache=True,
+    lazy=False,
+    loc=True,
+    stats_columns=None,
+):
+    """Load metadata, single-molecule localizations and track statistics
+
+    Parameters
+    ----------
+    yaml_path
+        YAML save file. Tracking data is read from the HDF5 file of the same name,
+        but with suffix ".h5".
+    convert_interval
+        Callable to convert recording interval keys (e.g., :py:class:`float`). Keys
+        which cannot be converted and special keys are left as they are. If not
+        callable, do not convert.
+    special
+        Whether to include special datasets (e.g., "registration").
+    n_frames
+        Number of frames per movie if it cannot be determined from the image files.
+        Only used for save file versions <= 2. Either a map of recording interval ->
+        number of frames or a regular expression whose first group extracts the
+        number from the file name.
+    frame_count_cache
+        Cache file for numbers of frames in image files. Only used for save file
+        versions <= 2. If `True`, use a file next to `yaml_path`. If `False`, do
+        not cache persistently.
+    lazy
+        If `True`, localization data and track statistics are returned as
+        read-only :py:class:`LazyHDFMapping` per recording interval, which read
+        data only when accessed. Otherwise, return dicts. Save file versions <= 2
+        are always read completely.
+    loc
+        If `False`, do not load localization data. The returned map of
+        localizations is empty.
+    stats_columns
+        If given, only read these track statistics columns (if present), e.g.,
+        ``["track_len", "censored", "filter_param", "filter_manual"]`` for
+        lifetime analysis. Only used for save file version >= 4; otherwise, all
+        columns are read.
 
-def load_data(yaml_path, convert_interval=float, special=False, n_frames={}):
+    Returns
+    -------
+    Metadata, map of recording interval -> file id -> localization data, map of
+    recording interval -> file id -> track statistics
+    """
     from sdt import roi  # noqa F401; needed to load YAML file
 
     yaml_path = Path(yaml_path)
@@ -95,9 +744,15 @@ def load_data(yaml_path, convert_interval=float, special=False, n_frames={}):
     version = yaml_data.get("file_version", 1)
 
     if version <= 2:
-        md, tracks, track_stats = load_data_v2(yaml_path, special, n_frames)
-    elif version == 3:
-        md, tracks, track_stats = load_data_v3(yaml_path, special)
+        md, tracks, track_stats = load_data_v2(
+            yaml_path, special, n_frames, frame_count_cache
+        )
+        if not loc:
+            tracks = {}
+    elif version in (3, 4):
+        md, tracks, track_stats = load_data_v3(
+            yaml_path, special, lazy, loc, stats_columns
+        )
     else:
         raise RuntimeError(f"save file version {version} not supported")
 
@@ -119,7 +774,7 @@ def load_data(yaml_path, convert_interval=float, special=False, n_frames={}):
     return md, tracks, track_stats
 
 
-def load_data_v2(yaml_path, special=False, n_frames={}):
+def load_data_v2(yaml_path, special=False, n_frames={}, frame_count_cache=True):
     yaml_path = Path(yaml_path)
     with yaml_path.open() as yf:
         yaml_data = io.yaml.safe_load(yf)
@@ -191,6 +846,22 @@ def load_data_v2(yaml_path, special=False, n_frames={}):
     data_dir = Path(yaml_data["data_dir"])
     frame_sel = multicolor.FrameSelector(yaml_data["excitation_seq"])
     acc_src = yaml_data["channels"]["acceptor"]["source"]
+
+    # Get numbers of frames from image file metadata. Cache them next to the save
+    # file, since opening many large files (on network storage) is slow.
+    if frame_count_cache is True:
+        frame_count_cache = yaml_path.with_suffix(".frame_counts.json")
+    fc_cache = FrameCountCache(frame_count_cache or None)
+    image_files = {
+        (interval, did): data_dir / yaml_data["files"][interval][did][acc_src]
+        for interval, trcs in tracks.items()
+        if interval not in special_keys
+        for did, t in trcs.items()
+        if "particle" in t
+    }
+    raw_n_frames = fc_cache.get_many(image_files.values())
+    fc_cache.save()
+
     track_stats = {}
     for interval, trcs in tracks.items():
         if interval in special_keys:
@@ -201,8 +872,10 @@ def load_data_v2(yaml_path, special=False, n_frames={}):
                 continue
             f = yaml_data["files"][interval][did][acc_src]
             try:
-                with io.ImageSequence(data_dir / f) as ims:
-                    nf = len(frame_sel.select(ims, "d"))
+                nf = raw_n_frames[image_files[interval, did]]
+                if isinstance(nf, Exception):
+                    raise nf
+                nf = len(frame_sel.select(np.arange(nf), "d"))
             except Exception:
                 if isinstance(n_frames, re.Pattern):
                     try:
@@ -227,7 +900,167 @@ def load_data_v2(yaml_path, special=False, n_frames={}):
     return yaml_data, tracks, track_stats
 
 
-def load_data_v3(yaml_path, special=False):
+def _h5_files(yaml_path: Path, overlays: list) -> list[Tuple[Path, set]]:
+    """List HDF5 files of a save file, newest first
+
+    Parameters
+    ----------
+    yaml_path
+        YAML save file
+    overlays
+        "h5_overlays" entry of the YAML file
+
+    Returns
+    -------
+    HDF5 file path and set of (interval, file id) pairs whose localization data
+    was removed in that file. The last entry is the base file.
+    """
+    ret = [
+        (yaml_path.parent / o["file"], {tuple(r) for r in o.get("removed", [])})
+        for o in overlays[::-1]
+    ]
+    ret.append((yaml_path.with_suffix(".h5"), set()))
+    return ret
+
+
+def select_loc(
+    yaml_path: str | Path,
+    interval: Any,
+    file: Any,
+    particles: Iterable[int] | None = None,
+    frames: Tuple[int, int] | None = None,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """Read localization data of selected tracks and/or frames
+
+    If the data was saved in "table" format (see :py:func:`save_data`), only
+    matching rows are read from disk. If it was saved using the "arrow" backend,
+    only requested columns are read. Otherwise, all data is read and filtered.
+
+    Parameters
+    ----------
+    yaml_path
+        YAML save file
+    interval, file
+        Recording interval and file id as in the YAML file
+    particles
+        Track numbers to select. If `None`, select all.
+    frames
+        First and last frame (inclusive) to select. If `None`, select all.
+    columns
+        Columns to return. If `None`, return all.
+
+    Returns
+    -------
+    Selected localization data
+    """
+    yaml_path = Path(yaml_path)
+    with yaml_path.open() as yf:
+        yaml_data = io.yaml.safe_load(yf)
+    key = f"/{interval}/{file}/loc"
+    if particles is not None:
+        particles = list(particles)
+    not_found = KeyError(
+        f"no localization data for interval {interval}, file {file}"
+    )
+
+    if yaml_data.get("storage_backend") == "arrow":
+        from .arrow_io import loc_name, read_arrow
+
+        p = yaml_path.parent / yaml_data["arrow_dir"] / str(interval) / str(file)
+        if not (p / loc_name).exists():
+            raise not_found
+        read_cols = None
+        if columns is not None:
+            read_cols = {*columns, "particle", "frame"}
+        ret = read_arrow(p / loc_name, read_cols)
+    else:
+        for f, removed in _h5_files(yaml_path, yaml_data.get("h5_overlays", [])):
+            if (interval, file) in removed:
+                raise not_found
+            with pd.HDFStore(f, "r") as s:
+                if s.get_node(key) is None:
+                    continue
+                if s.get_storer(key).is_table:
+                    where = []
+                    if particles is not None:
+                        where.append("particle in particles")
+                    if frames is not None:
+                        f0, f1 = (int(f) for f in frames)
+                        where.append("frame >= f0 & frame <= f1")
+                    return s.select(
+                        key, where=" & ".join(where) or None, columns=columns
+                    )
+                ret = s.get(key)
+                break
+        else:
+            raise not_found
+    if particles is not None:
+        ret = ret[ret["particle"].isin(particles)]
+    if frames is not None:
+        ret = ret[ret["frame"].between(*frames)]
+    return ret if columns is None else ret[columns]
+
+
+class LazyHDFMapping(collections.abc.Mapping):
+    """Read-only mapping of DataFrames which are read from HDF5 files on demand
+
+    Each value is read when first accessed and kept in memory afterwards.
+
+    Parameters
+    ----------
+    nodes
+        Map of key -> (HDF5 file, node name)
+    """
+
+    def __init__(self, nodes: Mapping[Any, Tuple[str | Path, str]]):
+        self._nodes = {k: (Path(f), n) for k, (f, n) in nodes.items()}
+        self._data = {}
+
+    def __getitem__(self, key: Any) -> pd.DataFrame:
+        try:
+            return self._data[key]
+        except KeyError:
+            pass
+        h5_path, node = self._nodes[key]
+        with pd.HDFStore(h5_path, "r") as s:
+            ret = self._data[key] = s.get(node)
+        return ret
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._nodes!r})"
+
+    def load(self) -> Dict[Any, pd.DataFrame]:
+        """Read all data, opening each HDF5 file only once
+
+        Returns
+        -------
+        Map of key -> DataFrame
+        """
+        by_file = {}
+        for k, (f, n) in self._nodes.items():
+            if k not in self._data:
+                by_file.setdefault(f, []).append((k, n))
+        for f, nodes in by_file.items():
+            with pd.HDFStore(f, "r") as s:
+                for k, n in nodes:
+                    self._data[k] = s.get(n)
+        return {k: self._data[k] for k in self._nodes}
+
+
+def load_data_v3(yaml_path, special=False, lazy=False, loc=True, stats_columns=None):
+    """Load save file versions 3 and 4
+
+    Version 4 differs in that track stats are stored in a single table, that
+    there may be overlay files written by incremental saves, and that data may be
+    stored in Arrow IPC files instead of HDF5 (see :py:func:`save_data`).
+    """
     yaml_path = Path(yaml_path)
     with yaml_path.open() as yf:
         yaml_data = io.yaml.safe_load(yf)
@@ -236,32 +1069,78 @@ def load_data_v3(yaml_path, special=False):
         for k in special_keys:
             yaml_data["files"].pop(k, None)
 
+    if yaml_data.get("storage_backend") == "arrow":
+        from .arrow_io import load_data_arrow
+
+        return load_data_arrow(yaml_path, yaml_data, lazy, loc, stats_columns)
+
     h5_path = yaml_path.with_suffix(".h5")
+    h5_files = _h5_files(yaml_path, yaml_data.pop("h5_overlays", []))
     tracks = {}
     track_stats = {}
     if h5_path.exists():
-        with pd.HDFStore(h5_path, "r") as s:
+        with contextlib.ExitStack() as stack:
+            stores = [
+                (f, stack.enter_context(pd.HDFStore(f, "r")), removed)
+                for f, removed in h5_files
+            ]
+            s = stores[-1][1]
+
+            def find_loc(interval, dkey):
+                n = f"/{interval}/{dkey}/loc"
+                for f, st, removed in stores:
+                    if (interval, dkey) in removed:
+                        return None
+                    if st.get_node(n) is not None:
+                        return f, n
+                return None
+
+            consolidated = yaml_data.get("file_version", 3) >= 4
+            if consolidated:
+                # tiny compared to localization data, read at once from the newest
+                # file, which always contains all track stats
+                all_stats = _split_track_stats_table(stores[0][1], stats_columns)
             for interval, dset in yaml_data["files"].items():
                 if interval in special_keys:
                     continue
-                tracks[interval] = {}
-                track_stats[interval] = {}
+                loc_nodes = {}
+                stats_nodes = {}
+                if consolidated:
+                    track_stats[interval] = {}
                 for dkey, dfiles in dset.items():
-                    try:
-                        tracks[interval][dkey] = s.get(f"/{interval}/{dkey}/loc")
-                    except KeyError:
-                        warnings.warn(
-                            f"localization data not found for interval {dkey},"
-                            f" file {dfiles.get('source_0', f'id {dkey}')}"
-                        )
-                    try:
-                        track_stats[interval][dkey] = s.get(
-                            f"/{interval}/{dkey}/track_stats"
-                        )
-                    except KeyError:
-                        warnings.warn(
-                            f"track statistics not found for interval {dkey},"
-                            f" file {dfiles.get('source_0', f'id {dkey}')}"
-                        )
+                    if loc:
+                        n = find_loc(interval, dkey)
+                        if n is not None:
+                            loc_nodes[dkey] = n
+                        else:
+                            warnings.warn(
+                                f"localization data not found for interval {dkey},"
+                                f" file {dfiles.get('source_0', f'id {dkey}')}"
+                            )
+                    if consolidated:
+                        ts = all_stats.get((str(interval), str(dkey)))
+                        if ts is not None:
+                            track_stats[interval][dkey] = ts
+                            continue
+                    else:
+                        n = f"/{interval}/{dkey}/track_stats"
+                        if s.get_node(n) is not None:
+                            stats_nodes[dkey] = (h5_path, n)
+                            continue
+                    warnings.warn(
+                        f"track statistics not found for interval {dkey},"
+                        f" file {dfiles.get('source_0', f'id {dkey}')}"
+                    )
+                if loc:
+                    tracks[interval] = LazyHDFMapping(loc_nodes)
+                if not consolidated:
+                    track_stats[interval] = LazyHDFMapping(stats_nodes)
+
+    if not lazy:
+        tracks = {k: v.load() for k, v in tracks.items()}
+        track_stats = {
+            k: v.load() if isinstance(v, LazyHDFMapping) else v
+            for k, v in track_stats.items()
+        }
 
     return yaml_data, tracks, track_stats
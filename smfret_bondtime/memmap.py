@@ -0,0 +1,128 @@
+# SPDX-FileCopyrightText: 2024 Lukas Schrangl <lukas.schrangl@boku.ac.at>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Zero-copy access to uncompressed TIFF stacks via memory mapping"""
+
+import collections
+import os
+from pathlib import Path
+
+import numpy as np
+from sdt import helper
+from sdt.io.image_sequence import Image
+from sdt.roi import ROI
+
+
+class MemmapSequence(helper.Slicerator):
+    """Image sequence backed by a memory-mapped array
+
+    Frames are read-only views of the mapped file, thus reading does not copy
+    data. Use :py:meth:`crop` instead of applying a :py:class:`sdt.roi.ROI`,
+    which would copy each frame, to get views of a region. Views of the same
+    frame, such as donor and acceptor channel ROIs of a dual-view recording,
+    share the operating system's page cache.
+
+    Like :py:class:`sdt.io.ImageSequence`, frames are
+    :py:class:`sdt.io.image_sequence.Image` instances with ``frame_no``
+    attribute.
+    """
+
+    def __init__(self, data: np.ndarray):
+        """Parameters
+        ----------
+        data
+            3D array of frames, typically a :py:class:`numpy.memmap`
+        """
+        super().__init__(data)
+
+    def __getitem__(self, key):
+        if isinstance(key, (slice, collections.abc.Iterable)):
+            # Default implementation would slice the array, losing frame numbers
+            return helper.Slicerator(self)[key]
+        return super().__getitem__(key)
+
+    def _get(self, key: int) -> Image:
+        if self._ancestor is None:
+            raise ValueError("sequence is closed")
+        ret = self._ancestor[key].view(Image)
+        ret.frame_no = key
+        return ret
+
+    def crop(self, roi: ROI) -> "MemmapSequence":
+        """Restrict frames to a rectangular region without copying
+
+        Parameters
+        ----------
+        roi
+            Region of interest
+
+        Returns
+        -------
+        Sequence of views of the region of each frame
+        """
+        if self._ancestor is None:
+            raise ValueError("sequence is closed")
+        sl = tuple(
+            slice(t, b) for t, b in zip(roi.top_left[::-1], roi.bottom_right[::-1])
+        )
+        return MemmapSequence(self._ancestor[(slice(None), *sl)])
+
+    def close(self):
+        """Release the mapping
+
+        The file is unmapped once all frames returned are garbage collected.
+        """
+        self._ancestor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def open_memmap(path: str | Path) -> MemmapSequence | None:
+    """Memory-map a TIFF stack if possible
+
+    This works for files with uncompressed, untiled, native byte order image data
+    stored contiguously as a single series of 2D frames, which is what most
+    acquisition software writes.
+
+    Parameters
+    ----------
+    path
+        TIFF file
+
+    Returns
+    -------
+    Frames with the same numbering and content as when reading `path` using
+    :py:class:`sdt.io.ImageSequence` or `None` if the file cannot be mapped.
+    """
+    import tifffile
+
+    if Path(path).suffix.lower() not in (".tif", ".tiff"):
+        return None
+    try:
+        with tifffile.TiffFile(path) as tif:
+            if len(tif.series) != 1:
+                return None
+            s = tif.series[0]
+            dtype = np.dtype(s.dtype).newbyteorder(tif.byteorder)
+            if (
+                s.dataoffset is None
+                or s.ndim not in (2, 3)
+                or not dtype.isnative
+                or tif.pages[0].shape != s.shape[-2:]
+            ):
+                return None
+            shape = s.shape if s.ndim == 3 else (1, *s.shape)
+            if len(tif.pages) != shape[0]:
+                return None
+            offset = s.dataoffset
+        if os.path.getsize(path) < offset + np.prod(shape) * dtype.itemsize:
+            return None
+        data = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+    except Exception:
+        return None
+    return MemmapSequence(data)
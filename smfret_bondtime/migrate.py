@@ -0,0 +1,247 @@
+# SPDX-FileCopyrightText: 2024 Lukas Schrangl <lukas.schrangl@boku.ac.at>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Convert save files of older versions to the current format
+
+Run as ``python -m smfret_bondtime.migrate <directory>``. See ``--help`` for
+options.
+"""
+
+import argparse
+import concurrent.futures
+import os
+from pathlib import Path
+import re
+import shutil
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Mapping
+
+from sdt import io
+
+from .io import file_version, load_data, save_data
+
+
+def get_file_version(yaml_path: str | Path) -> int | None:
+    """Get save file version
+
+    Parameters
+    ----------
+    yaml_path
+        YAML file
+
+    Returns
+    -------
+    Save file version or `None` if `yaml_path` is not a save file.
+    """
+    from sdt import roi  # noqa F401; needed to load YAML file
+
+    with Path(yaml_path).open() as yf:
+        yaml_data = io.yaml.safe_load(yf)
+    if not isinstance(yaml_data, dict) or "files" not in yaml_data:
+        return None
+    return yaml_data.get("file_version", 1)
+
+
+def find_legacy_files(
+    root: str | Path, current_version: int = file_version
+) -> List[Path]:
+    """Find save files of older versions in a directory tree
+
+    Parameters
+    ----------
+    root
+        Directory to search recursively
+    current_version
+        Files of this version or newer are skipped.
+
+    Returns
+    -------
+    Sorted list of YAML files
+    """
+    ret = []
+    for p in sorted(Path(root).rglob("*.yaml")):
+        if len(p.suffixes) > 1 and re.fullmatch(r"\.(tmp|v\d+)", p.suffixes[-2]):
+            # temporary files and backups
+            continue
+        try:
+            v = get_file_version(p)
+        except Exception:
+            continue
+        if v is not None and v < current_version:
+            ret.append(p)
+    return ret
+
+
+def migrate_file(
+    yaml_path: str | Path,
+    n_frames: Mapping | str = {},
+    backup: bool = True,
+) -> Dict[str, Any]:
+    """Convert a save file to the current format
+
+    Data is loaded, track statistics are computed, and everything is written back
+    using :py:func:`io.save_data`, which replaces the files atomically.
+
+    Parameters
+    ----------
+    yaml_path
+        YAML save file. The HDF5 file is expected next to it.
+    n_frames
+        Passed to :py:func:`io.load_data` in case the number of frames cannot be
+        determined from image files.
+    backup
+        If `True`, keep the original files, adding the file version to the name,
+        e.g., ``data.v2.yaml`` and ``data.v2.h5``.
+
+    Returns
+    -------
+    Statistics with keys "version" (original file version), "files" (number of
+    movies), "localizations", and "time" (in seconds).
+    """
+    t0 = time.perf_counter()
+    yaml_path = Path(yaml_path)
+    version = get_file_version(yaml_path)
+    md, tracks, track_stats = load_data(
+        yaml_path, convert_interval=None, special=True, n_frames=n_frames, lazy=False
+    )
+    md.pop("file_version", None)
+
+    if backup:
+        for p in yaml_path, yaml_path.with_suffix(".h5"):
+            bak = p.with_suffix(f".v{version}{p.suffix}")
+            if not p.exists() or bak.exists():
+                continue
+            try:
+                os.link(p, bak)
+            except OSError:
+                shutil.copy2(p, bak)
+
+    save_data(yaml_path, md, tracks, track_stats)
+
+    return {
+        "version": version,
+        "files": sum(len(t) for t in tracks.values()),
+        "localizations": sum(len(d) for t in tracks.values() for d in t.values()),
+        "time": time.perf_counter() - t0,
+    }
+
+
+def migrate_files(
+    yaml_paths: Iterable[str | Path],
+    n_frames: Mapping | str = {},
+    backup: bool = True,
+    n_jobs: int = 1,
+    verbose: bool = True,
+) -> Dict[Path, Dict[str, Any] | Exception]:
+    """Convert save files to the current format using multiple processes
+
+    Each save file is converted in a worker process (see :py:func:`migrate_file`).
+
+    Parameters
+    ----------
+    yaml_paths
+        YAML save files
+    n_frames, backup
+        Passed to :py:func:`migrate_file`.
+    n_jobs
+        Number of worker processes. If 1, do not use multiprocessing.
+    verbose
+        Print progress and throughput to stderr.
+
+    Returns
+    -------
+    Map of save file -> statistics returned by :py:func:`migrate_file` or
+    exception raised during conversion.
+    """
+    yaml_paths = [Path(p) for p in yaml_paths]
+    ret = {}
+    n_locs = 0
+    t0 = time.perf_counter()
+
+    def report(p, res):
+        nonlocal n_locs
+        ret[p] = res
+        if isinstance(res, Exception):
+            msg = f"failed: {res!r}"
+        else:
+            n_locs += res["localizations"]
+            msg = (
+                f"v{res['version']}, {res['files']} files, "
+                f"{res['localizations']} localizations, {res['time']:.1f} s"
+            )
+        if verbose:
+            elapsed = time.perf_counter() - t0
+            print(
+                f"[{len(ret)}/{len(yaml_paths)}] {p}: {msg} "
+                f"({len(ret) / elapsed * 3600:.0f} save files/h, "
+                f"{n_locs / elapsed:.0f} localizations/s)",
+                file=sys.stderr,
+            )
+
+    if n_jobs == 1:
+        for p in yaml_paths:
+            try:
+                res = migrate_file(p, n_frames, backup)
+            except Exception as e:
+                res = e
+            report(p, res)
+        return ret
+
+    with concurrent.futures.ProcessPoolExecutor(n_jobs) as ex:
+        futs = {ex.submit(migrate_file, p, n_frames, backup): p for p in yaml_paths}
+        for f in concurrent.futures.as_completed(futs):
+            exc = f.exception()
+            report(futs[f], f.result() if exc is None else exc)
+    return {p: ret[p] for p in yaml_paths}
+
+
+def main(argv: List[str] | None = None) -> int:
+    argp = argparse.ArgumentParser(
+        prog="python -m smfret_bondtime.migrate",
+        description="Convert save files in a directory tree to the current format",
+    )
+    argp.add_argument("root", type=Path, help="Directory to search for save files")
+    argp.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes (default: number of CPUs)",
+    )
+    argp.add_argument(
+        "--n-frames",
+        default={},
+        help="Regular expression extracting the number of frames from the image "
+        "file name (first group) if it cannot be read from the file",
+    )
+    argp.add_argument(
+        "--no-backup", action="store_true", help="Do not keep original files"
+    )
+    argp.add_argument(
+        "-n", "--dry-run", action="store_true", help="Only list files to convert"
+    )
+    args = argp.parse_args(argv)
+
+    files = find_legacy_files(args.root)
+    if args.dry_run:
+        for f in files:
+            print(f)
+        return 0
+
+    t0 = time.perf_counter()
+    res = migrate_files(files, args.n_frames, not args.no_backup, args.jobs)
+    failed = [p for p, r in res.items() if isinstance(r, Exception)]
+    print(
+        f"converted {len(files) - len(failed)} of {len(files)} save files in "
+        f"{time.perf_counter() - t0:.1f} s",
+        file=sys.stderr,
+    )
+    for p in failed:
+        print(f"failed: {p}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
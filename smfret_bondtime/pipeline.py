@@ -0,0 +1,1124 @@
+# SPDX-FileCopyrightText: 2024 Lukas Schrangl <lukas.schrangl@boku.ac.at>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Analysis of whole projects without the GUI
+
+All stages (localization, tracking, changepoint detection, filtering, and
+lifetime fitting) are run on all files of a save file created using the GUI,
+which defines channels, registration, bleed-through correction, and options.
+Run as ``python -m smfret_bondtime.pipeline <save file>``. See ``--help`` for
+options.
+"""
+
+import argparse
+import concurrent.futures
+import contextlib
+import copy
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+import pandas as pd
+import scipy.ndimage
+from sdt import (
+    brightness,
+    changepoint,
+    helper,
+    io,
+    loc,
+    multicolor,
+    roi,
+    spatial,
+)
+
+from .analysis import LifetimeAnalyzer, calc_track_stats
+from .io import load_data, save_data, special_keys
+from .memmap import MemmapSequence, open_memmap
+from .prefetch import PrefetchSequence, default_depth
+
+stages = ["locate", "track", "changepoints", "filter", "fit"]
+"""Names of analysis stages in the order they are run"""
+
+default_bleed_through = {"background": 200.0, "factor": 0.0, "smooth": 1.0}
+default_filter_options = {
+    "mass_thresh": 0,
+    "bg_thresh": 0,
+    "min_length": 2,
+    "min_changepoints": 1,
+    "max_changepoints": 2,
+    "start_end_changepoints": True,
+}
+empty_stats_columns = ["start", "end", "track_len", "censored", "bg", "mass"]
+
+
+class ImagePipeline:
+    """Preprocess image sequences for localization and brightness measurement
+
+    Selects donor excitation frames and channels, registers the donor channel to
+    the acceptor channel and subtracts donor bleed-through from the acceptor
+    channel.
+    """
+
+    channels: Dict[str, Dict[str, Any]]
+    """Map of channel name ("donor", "acceptor") -> dict with keys "source"
+    (image source, e.g., "source_0") and "roi" (:py:class:`sdt.roi.ROI` or `None`)
+    """
+    registrator: multicolor.Registrator
+    """Transforms donor into acceptor coordinates"""
+    bleed_through: Dict[str, float]
+    """Bleed-through correction parameters "background", "factor", and "smooth"
+    """
+    frame_selector: multicolor.FrameSelector
+    """Selects donor excitation frames"""
+
+    def __init__(
+        self,
+        channels: Mapping[str, Mapping[str, Any]] | None = None,
+        registrator: multicolor.Registrator | None = None,
+        bleed_through: Mapping[str, float] = {},
+        excitation_seq: str = "",
+    ):
+        """Parameters
+        ----------
+        channels
+            Set :py:attr:`channels`. If `None`, use "source_0" for both channels.
+        registrator
+            Set :py:attr:`registrator`. If `None`, use identity transform.
+        bleed_through
+            Update default bleed-through parameters
+        excitation_seq
+            Excitation sequence, see :py:class:`sdt.multicolor.FrameSelector`
+        """
+        if channels is None:
+            channels = {
+                "donor": {"roi": None, "source": "source_0"},
+                "acceptor": {"roi": None, "source": "source_0"},
+            }
+        self.channels = copy.deepcopy(dict(channels))
+        if registrator is None:
+            registrator = multicolor.Registrator()
+            registrator.channel_names = list(self.channels)
+        self.registrator = registrator
+        self.bleed_through = {**default_bleed_through, **bleed_through}
+        self.frame_selector = multicolor.FrameSelector(excitation_seq)
+
+    @classmethod
+    def from_metadata(cls, metadata: Mapping[str, Any]) -> "ImagePipeline":
+        """Create from save file metadata
+
+        Parameters
+        ----------
+        metadata
+            As returned by :py:func:`io.load_data`
+
+        Returns
+        -------
+        New instance
+        """
+        return cls(
+            metadata.get("channels"),
+            metadata.get("registrator"),
+            metadata.get("bleed_through", {}),
+            metadata.get("excitation_seq", ""),
+        )
+
+    def process(
+        self, image_seqs: Mapping[str, helper.Slicerator], channel: str
+    ) -> helper.Slicerator:
+        """Get processed image sequence
+
+        Parameters
+        ----------
+        image_seqs
+            Map of source name (e.g., "source_0") -> image sequence
+        channel
+            "donor", "acceptor", or "corrAcceptor" (bleed-through corrected
+            acceptor channel)
+
+        Returns
+        -------
+        Donor excitation frames of `channel`. The number of frames before frame
+        selection is available as ``orig_frame_count`` attribute.
+        """
+        if channel in ("donor", "acceptor"):
+            ch = self.channels.get(channel, {})
+            r = ch.get("roi")
+            s = ch.get("source")
+            if s is not None:
+                seq = image_seqs.get(s)
+            if r is not None:
+                if isinstance(seq, MemmapSequence) and type(r) is roi.ROI:
+                    # Avoid copying full frames
+                    seq = seq.crop(r)
+                else:
+                    seq = r(seq)
+            if channel == "donor":
+                seq = self.registrator(
+                    seq, channel="donor", cval=self.bleed_through["background"]
+                )
+
+            # Remember frame count. Necessary to adjust frame numbers after
+            # localization in slices. See `locate`.
+            cnt = len(seq)
+
+            if seq is not None:
+                seq = self.frame_selector.select(seq, "d")
+
+            seq.orig_frame_count = cnt
+            return seq
+        if channel.startswith("corrAcceptor"):
+            d = self.process(image_seqs, "donor")
+            a = self.process(image_seqs, "acceptor")
+            bg = self.bleed_through["background"]
+            bt = self.bleed_through["factor"]
+            smt = self.bleed_through["smooth"]
+
+            def corr(donor, acceptor):
+                no_bg = np.asanyarray(donor, dtype=float) - bg
+                if smt >= 1e-3:
+                    no_bg = scipy.ndimage.gaussian_filter(no_bg, smt)
+                return acceptor - no_bg * bt
+
+            seq = helper.Pipeline(corr, d, a, propagate_attrs={"orig_frame_count"})
+            return seq
+        raise ValueError(f"unknown channel {channel!r}")
+
+
+@contextlib.contextmanager
+def open_images(
+    files: Mapping[str, str | Path | helper.Slicerator],
+    prefetch: int = default_depth,
+    memmap: bool = True,
+):
+    """Open image files, closing them on exit
+
+    Parameters
+    ----------
+    files
+        Map of source name -> image file. Image sequences are passed through.
+    prefetch
+        If positive, read this many frames ahead in a background thread using
+        :py:class:`PrefetchSequence`.
+    memmap
+        Memory-map uncompressed TIFF files (see :py:func:`open_memmap`) instead
+        of reading and copying each frame. `prefetch` is only used for files
+        which cannot be mapped.
+
+    Yields
+    ------
+    Map of source name -> image sequence
+    """
+    with contextlib.ExitStack() as stack:
+        ret = {}
+        for src, f in files.items():
+            if isinstance(f, (str, os.PathLike)):
+                m = open_memmap(f) if memmap else None
+                if m is not None:
+                    f = stack.enter_context(m)
+                else:
+                    f = stack.enter_context(io.ImageSequence(f))
+                    if prefetch > 0:
+                        f = stack.enter_context(PrefetchSequence(f, prefetch))
+            ret[src] = f
+        yield ret
+
+
+def _read_ahead(path: str | Path, block_size: int = 2**24):
+    """Read a file into the operating system's page cache
+
+    Data is discarded. Subsequent reads, also by other processes, are fast even
+    if the file is on slow (e.g., network) storage, while memory is managed by the
+    operating system.
+
+    Parameters
+    ----------
+    path
+        File to read
+    block_size
+        Number of bytes to read at once
+    """
+    buf = bytearray(block_size)
+    with open(path, "rb", buffering=0) as f:
+        while f.readinto(buf):
+            pass
+
+
+def _locate_frames(
+    files: Mapping[str, str | Path],
+    pipeline: ImagePipeline,
+    algorithm: str,
+    options: Mapping[str, Any],
+    start: int = 0,
+    stop: int | None = None,
+) -> Tuple[pd.DataFrame, int]:
+    """Localize in a range of donor excitation frames
+
+    Returns
+    -------
+    Localizations with frame numbers referring to the original image sequence and
+    the number of frames before frame selection
+    """
+    batch = getattr(loc, algorithm).batch
+    with open_images(files) as imgs:
+        pipe = pipeline.process(imgs, "corrAcceptor")
+        orig_frame_count = pipe.orig_frame_count
+        if start != 0 or stop is not None:
+            pipe = pipe[start:stop]
+        lc = batch(pipe, **options)
+    return lc, orig_frame_count
+
+
+def locate(
+    files: Mapping[str, str | Path],
+    pipeline: ImagePipeline,
+    algorithm: str,
+    options: Mapping[str, Any],
+    n_jobs: int = 1,
+    executor: concurrent.futures.Executor | None = None,
+) -> pd.DataFrame:
+    """Localize single molecules in the bleed-through corrected acceptor channel
+
+    Parameters
+    ----------
+    files
+        Map of source name -> image file
+    pipeline
+        Image preprocessing
+    algorithm
+        Name of a :py:mod:`sdt.loc` submodule, e.g., "daostorm_3d"
+    options
+        Passed to the algorithm's ``batch`` function
+    n_jobs
+        If not 1, split frames into chunks which are localized concurrently
+        using this many processes. If less than 1, use as many as there are
+        CPUs. Results are the same as when localizing serially.
+    executor
+        Executor to localize chunks of frames. If given, `n_jobs` is only used
+        to determine the number of chunks.
+
+    Returns
+    -------
+    Localizations. Frame numbers refer to the original image sequence.
+    """
+    if n_jobs == 1 and executor is None:
+        lc, orig_frame_count = _locate_frames(files, pipeline, algorithm, options)
+    else:
+        with open_images(files) as imgs:
+            n_frames = len(pipeline.process(imgs, "corrAcceptor"))
+        if n_jobs < 1:
+            n_jobs = os.cpu_count() or 1
+        # Several chunks per job to balance load
+        n_chunks = max(1, min(n_frames, 4 * n_jobs))
+        bounds = np.linspace(0, n_frames, n_chunks + 1).round().astype(int)
+        with contextlib.ExitStack() as stack:
+            if executor is None:
+                executor = stack.enter_context(
+                    concurrent.futures.ProcessPoolExecutor(n_jobs)
+                )
+            futs = [
+                executor.submit(
+                    _locate_frames, files, pipeline, algorithm, options, b0, b1
+                )
+                for b0, b1 in zip(bounds[:-1], bounds[1:])
+            ]
+            res = [f.result() for f in futs]
+        lc = pd.concat([r[0] for r in res], ignore_index=True)
+        orig_frame_count = res[0][1]
+    # Since sdt-python 17.1, frame numbers are preserved when using
+    # slices of ImageSequence.
+    lc["frame"] = pipeline.frame_selector.renumber_frames(
+        lc["frame"].to_numpy(), "d", n_frames=orig_frame_count
+    )
+    return lc
+
+
+def add_extra_frames(trc: pd.DataFrame, n_extra: int, n_frames: int) -> pd.DataFrame:
+    """Add frames before the start and after the end of each track
+
+    Used to measure brightness around tracks. Added frames are marked in the
+    "extra_frame" column (1 before, 2 after the track).
+
+    Parameters
+    ----------
+    trc
+        Tracking data
+    n_extra
+        Number of frames to add at each end
+    n_frames
+        Number of frames in the image sequence
+
+    Returns
+    -------
+    Tracking data with extra frames
+    """
+    if n_extra <= 0:
+        trc["extra_frame"] = 0
+        return trc
+    trc_s = []
+    for p, t in helper.split_dataframe(trc, "particle", type="DataFrame"):
+        t.sort_values("frame", ignore_index=True, inplace=True)
+        t["extra_frame"] = 0
+        mini = t.loc[0, "frame"]
+        pre = pd.DataFrame(
+            {
+                "frame": np.arange(max(0, mini - n_extra), mini),
+                "extra_frame": 1,
+                "particle": p,
+                "interp": 1,
+                "x": t.loc[0, "x"],
+                "y": t.loc[0, "y"],
+            }
+        )
+        i = t.index[-1]
+        maxi = t.loc[i, "frame"]
+        post = pd.DataFrame(
+            {
+                "frame": np.arange(maxi + 1, min(maxi + n_extra + 1, n_frames)),
+                "extra_frame": 2,
+                "particle": p,
+                "interp": 1,
+                "x": t.loc[i, "x"],
+                "y": t.loc[i, "y"],
+            }
+        )
+        a = pd.concat([pre, t, post], ignore_index=True)
+        trc_s.append(a)
+    return pd.concat(trc_s, ignore_index=True)
+
+
+def track(
+    loc_data: pd.DataFrame,
+    files: Mapping[str, str | Path],
+    pipeline: ImagePipeline,
+    options: Mapping[str, Any],
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Link localizations into tracks and measure brightness
+
+    Parameters
+    ----------
+    loc_data
+        Localizations as returned by :py:func:`locate`
+    files
+        Map of source name -> image file
+    pipeline
+        Image preprocessing
+    options
+        Passed to :py:func:`trackpy.link`, except for "extra_frames", which is
+        passed to :py:func:`add_extra_frames`.
+
+    Returns
+    -------
+    Tracking data and track statistics
+    """
+    import trackpy
+
+    opts = dict(options)
+    extra = opts.pop("extra_frames", 0)
+    trackpy.quiet()
+    if loc_data.empty:
+        trc = loc_data.copy()
+        # This adds the "particle" column
+        trc["particle"] = 0
+        trc_stats = pd.DataFrame(columns=empty_stats_columns)
+    else:
+        if "extra_frame" in loc_data:
+            loc_data = loc_data[loc_data["extra_frame"] == 0]
+        loc_data = loc_data[~loc_data["x"].isnull() & ~loc_data["y"].isnull()]
+        trc = trackpy.link(loc_data, **opts)
+        trc = spatial.interpolate_coords(trc)
+
+        with open_images(files) as imgs:
+            pipe = pipeline.process(imgs, "corrAcceptor")
+            trc = add_extra_frames(trc, extra, len(pipe))
+            brightness.from_raw_image(trc, pipe, radius=3, mask="circle")
+            trc_stats = calc_track_stats(trc, len(pipe))
+    trc_stats["filter_param"] = -1
+    trc_stats["filter_manual"] = -1
+    return trc, trc_stats
+
+
+# TODO: this should be in sdt.changepoint.utils
+def indices_to_segments(indices: np.ndarray, length: int) -> np.ndarray:
+    """Convert changepoint indices to segment numbers for each data point"""
+    seg = np.arange(len(indices) + 1)
+    reps = np.diff(indices, prepend=0, append=length)
+    return np.repeat(seg, reps)
+
+
+def find_changepoints(
+    tracks: pd.DataFrame, stats: pd.DataFrame, options: Mapping[str, Any]
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Detect changepoints in brightness traces
+
+    Parameters
+    ----------
+    tracks
+        Tracking data
+    stats
+        Track statistics
+    options
+        Passed to :py:meth:`sdt.changepoint.Pelt.find_changepoints`
+
+    Returns
+    -------
+    Tracking data with additional "mass_seg" column (segment number) and track
+    statistics with additional "changepoints" column (number of changepoints)
+    """
+    if len(tracks) < 1:
+        return tracks.copy(), stats.copy()
+    cp_det = changepoint.Pelt()
+    td = tracks.sort_values(["particle", "frame"])
+    st = stats.copy()
+    cps = []
+    st["changepoints"] = -1
+    for p, (idx, mass) in helper.split_dataframe(
+        td, "particle", ["mass"], type="array_list", keep_index=True, sort=False
+    ):
+        c = cp_det.find_changepoints(mass, **options)
+        s = indices_to_segments(c, len(mass))
+        cps.append(pd.Series(s, index=idx))
+        st.loc[p, "changepoints"] = len(c)
+    td["mass_seg"] = pd.concat(cps)
+    return td, st
+
+
+def filter_tracks(
+    track_stats: pd.DataFrame,
+    bg_thresh: float = 0,
+    mass_thresh: float = 0,
+    min_length: int = 2,
+    min_changepoints: int = 1,
+    max_changepoints: int = 2,
+    start_end_changepoints: bool = True,
+) -> pd.Series:
+    """Apply parametric filters to tracks
+
+    The "filter_param" column of `track_stats` is set in place to 1 for rejected
+    and 0 for accepted tracks.
+
+    Parameters
+    ----------
+    track_stats
+        Track statistics
+    bg_thresh
+        If positive, reject tracks with at least this background
+    mass_thresh
+        If positive, reject tracks with at most this brightness
+    min_length
+        Reject tracks shorter than this
+    min_changepoints, max_changepoints
+        If changepoints were detected, reject tracks with fewer or more
+        changepoints
+    start_end_changepoints
+        Count start and end of a track as changepoints unless censored
+
+    Returns
+    -------
+    Boolean Series, `True` for accepted tracks
+    """
+    flt = np.zeros(len(track_stats), dtype=bool)
+    if bg_thresh > 0:
+        flt |= track_stats["bg"] >= bg_thresh
+    if mass_thresh > 0:
+        flt |= track_stats["mass"] <= mass_thresh
+    if min_length > 1:
+        flt |= track_stats["track_len"] < min_length
+    if "changepoints" in track_stats:
+        cp = track_stats["changepoints"].to_numpy(copy=True)
+        if start_end_changepoints:
+            cp += track_stats["censored"] & 1
+            cp += track_stats["censored"] & 2
+        flt |= cp < min_changepoints
+        flt |= cp > max_changepoints
+    track_stats["filter_param"] = flt.astype(int)
+    return track_stats["filter_param"] == 0
+
+
+def fit(
+    track_stats: Mapping[Any, Mapping[Any, pd.DataFrame]],
+    filter_options: Mapping[str, Any] = {},
+    fit_options: Mapping[str, Any] = {},
+    n_jobs: int = 1,
+    accept_undecided: bool = False,
+    executor: concurrent.futures.Executor | None = None,
+) -> LifetimeAnalyzer:
+    """Calculate lifetime as in the GUI's results page
+
+    Parameters
+    ----------
+    track_stats
+        Map of recording interval -> file id -> track statistics. Interval keys
+        need to be convertible to :py:class:`float`.
+    filter_options
+        "min_length" is used as minimum track length.
+    fit_options
+        "min_track_count", "n_boot" (bootstrap if > 1), "random_seed", and if
+        "adaptive_boot" is true, "boot_tolerance".
+    n_jobs
+        Number of processes for bootstrapping. Ignored if `executor` is given.
+    accept_undecided
+        As in the GUI, only tracks which were accepted manually are used by
+        default. If `True`, also use tracks which were neither accepted nor
+        rejected manually.
+    executor
+        Executor for bootstrapping, see
+        :py:meth:`LifetimeAnalyzer.calc_lifetime_bootstrap`
+
+    Returns
+    -------
+    Analyzer with results
+    """
+    tstats = {}
+    for intv, dset in track_stats.items():
+        if intv in special_keys:
+            continue
+        tstats[float(intv)] = {
+            fid: (
+                ts.assign(filter_manual=ts["filter_manual"].clip(lower=0))
+                if accept_undecided and "filter_manual" in ts
+                else ts
+            )
+            for fid, ts in dset.items()
+        }
+    ana = LifetimeAnalyzer(
+        tstats,
+        min_track_length=filter_options.get("min_length", 2),
+        min_track_count=fit_options.get("min_track_count", 10),
+    )
+    n_boot = fit_options.get("n_boot", 1)
+    if n_boot < 2:
+        ana.calc_lifetime()
+    else:
+        ana.calc_lifetime_bootstrap(
+            n_boot,
+            fit_options.get("random_seed"),
+            n_jobs=n_jobs,
+            executor=executor,
+            rtol=(
+                fit_options.get("boot_tolerance")
+                if fit_options.get("adaptive_boot")
+                else None
+            ),
+        )
+    return ana
+
+
+def _source_map(sources: List[str], files: Tuple) -> Dict[str, str | Path]:
+    return {s: f for s, f in zip(sources, files) if f is not None}
+
+
+class LocateStage:
+    """Picklable callable running :py:func:`locate` on one file
+
+    Settings are captured by value, so the GUI may be changed while a batch is
+    processed, and instances can be sent to worker processes.
+    """
+
+    def __init__(
+        self,
+        pipeline: ImagePipeline,
+        algorithm: str,
+        options: Mapping[str, Any],
+        sources: List[str],
+        n_jobs: int = 1,
+    ):
+        """Parameters
+        ----------
+        pipeline, algorithm, options, n_jobs
+            Passed to :py:func:`locate`
+        sources
+            Source names of image files passed to :py:meth:`__call__`
+        """
+        self.pipeline = copy.deepcopy(pipeline)
+        self.algorithm = algorithm
+        self.options = copy.deepcopy(dict(options))
+        self.sources = list(sources)
+        self.n_jobs = n_jobs
+
+    def __call__(self, *files: str | Path) -> pd.DataFrame:
+        """Localize
+
+        Parameters
+        ----------
+        *files
+            One image file per source
+
+        Returns
+        -------
+        Localization data
+        """
+        files = _source_map(self.sources, files)
+        return locate(files, self.pipeline, self.algorithm, self.options, self.n_jobs)
+
+
+class TrackStage:
+    """Picklable callable running :py:func:`track` on one file
+
+    See also :py:class:`LocateStage`.
+    """
+
+    def __init__(
+        self, pipeline: ImagePipeline, options: Mapping[str, Any], sources: List[str]
+    ):
+        """Parameters
+        ----------
+        pipeline, options
+            Passed to :py:func:`track`
+        sources
+            Source names of image files passed to :py:meth:`__call__`
+        """
+        self.pipeline = copy.deepcopy(pipeline)
+        self.options = copy.deepcopy(dict(options))
+        self.sources = list(sources)
+
+    def __call__(
+        self, loc_data: pd.DataFrame, *files: str | Path
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Track
+
+        Parameters
+        ----------
+        loc_data
+            Localization data
+        *files
+            One image file per source
+
+        Returns
+        -------
+        Tracking data and track statistics
+        """
+        return track(
+            loc_data, _source_map(self.sources, files), self.pipeline, self.options
+        )
+
+
+class ChangepointStage:
+    """Picklable callable running :py:func:`find_changepoints` on one file
+
+    See also :py:class:`LocateStage`.
+    """
+
+    def __init__(self, options: Mapping[str, Any]):
+        """Parameters
+        ----------
+        options
+            Passed to :py:func:`find_changepoints`
+        """
+        self.options = copy.deepcopy(dict(options))
+
+    def __call__(
+        self, tracks: pd.DataFrame, stats: pd.DataFrame
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Detect changepoints
+
+        Parameters
+        ----------
+        tracks
+            Tracking data
+        stats
+            Track statistics
+
+        Returns
+        -------
+        Tracking data and track statistics including changepoint information
+        """
+        return find_changepoints(tracks, stats, self.options)
+
+
+class _PipelineError:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+def _pipelined(
+    items: Iterable, funcs: Sequence[Callable[[Any], Any]], queue_size: int = 1
+) -> Iterator:
+    """Apply functions one after another to items, overlapping execution
+
+    Each function runs in its own thread, taking items from the previous function
+    via a queue. Thus while the first function processes item N+1, the second one
+    processes item N, and so on.
+
+    Parameters
+    ----------
+    items
+        Input items
+    funcs
+        Functions to apply. Each is called with the return value of the previous
+        one.
+    queue_size
+        Maximum number of items waiting between two functions. This limits memory
+        usage.
+
+    Yields
+    ------
+    Results of last function in the order of `items`. If a function raised an
+    exception, it is re-raised here.
+    """
+    done = object()
+    stop = threading.Event()
+    queues = [queue.Queue(queue_size) for _ in funcs]
+
+    def put(q, x):
+        while not stop.is_set():
+            try:
+                q.put(x, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def work(func, src, dest):
+        try:
+            for x in src:
+                if stop.is_set():
+                    return
+                put(dest, x if isinstance(x, _PipelineError) else func(x))
+        except BaseException as e:
+            put(dest, _PipelineError(e))
+        put(dest, done)
+
+    def drain(q):
+        while not stop.is_set():
+            try:
+                x = q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if x is done:
+                return
+            yield x
+
+    threads = [
+        threading.Thread(
+            target=work,
+            args=(f, items if i == 0 else drain(queues[i - 1]), queues[i]),
+            daemon=True,
+        )
+        for i, f in enumerate(funcs)
+    ]
+    for t in threads:
+        t.start()
+    try:
+        for x in drain(queues[-1]):
+            if isinstance(x, _PipelineError):
+                raise x.exc
+            yield x
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
+
+
+def run(
+    yaml_path: str | Path,
+    out_path: str | Path | None = None,
+    run_stages: List[str] = stages,
+    n_jobs: int = 1,
+    accept_undecided: bool = False,
+    verbose: bool = True,
+    pipelined: bool = False,
+    queue_size: int = 1,
+) -> Tuple[Dict[str, Any], Dict, Dict, LifetimeAnalyzer | None]:
+    """Run analysis stages on all files of a save file
+
+    Stages not run use data from the save file.
+
+    Parameters
+    ----------
+    yaml_path
+        Save file created using the GUI
+    out_path
+        Where to save results. If `None`, overwrite `yaml_path`. If `False`, do not
+        save.
+    run_stages
+        Stages to run, see :py:data:`stages`
+    n_jobs
+        Number of worker processes. Files are processed in parallel by the
+        "locate", "track", and "changepoints" stages. If there are fewer files
+        than processes, frames of each file are localized in parallel instead.
+        Also passed to :py:func:`fit`. If 1, do not use multiprocessing. If less
+        than 1, use as many as there are CPUs.
+    accept_undecided
+        Passed to :py:func:`fit`
+    verbose
+        Print progress to stderr
+    pipelined
+        Instead of running each stage on all files before the next one, pass each
+        file through all stages up to "filter". Stages run concurrently, so that,
+        e.g., file N+1 is read into the operating system's page cache while file
+        N is localized and file N-1 is tracked. Frames of each file are localized
+        in parallel by `n_jobs` processes, and other stages run in worker
+        processes, too.
+    queue_size
+        Number of files waiting between stages if `pipelined`
+
+    Returns
+    -------
+    Metadata, map of recording interval -> file id -> localization data, map of
+    recording interval -> file id -> track statistics, and analyzer with results of
+    the "fit" stage (`None` if not run).
+    """
+    unknown = set(run_stages) - set(stages)
+    if unknown:
+        raise ValueError(f"unknown stages: {', '.join(sorted(unknown))}")
+    yaml_path = Path(yaml_path)
+    md, loc_data, track_stats = load_data(
+        yaml_path, convert_interval=None, special=True, lazy=False
+    )
+    loc_data = {k: dict(v) for k, v in loc_data.items()}
+    track_stats = {k: dict(v) for k, v in track_stats.items()}
+    pipeline = ImagePipeline.from_metadata(md)
+    data_dir = Path(md.get("data_dir", ""))
+    filter_options = {**default_filter_options, **md.get("filter_options", {})}
+
+    def log(msg):
+        if verbose:
+            print(msg, file=sys.stderr)
+
+    sources = sorted(
+        {
+            s
+            for intv, dset in md["files"].items()
+            if intv not in special_keys
+            for srcs in dset.values()
+            for s in srcs
+        }
+    )
+    stage_funcs = {
+        "track": TrackStage(pipeline, md.get("track_options", {}), sources),
+        "changepoints": ChangepointStage(md.get("changepoint_options", {})),
+    }
+    if "locate" in run_stages:
+        stage_funcs["locate"] = LocateStage(
+            pipeline, md["loc_algorithm"], md.get("loc_options", {}), sources
+        )
+
+    def filter_func(tracks, stats):
+        filter_tracks(stats, **filter_options)
+        return tracks, stats
+
+    stage_funcs["filter"] = filter_func
+
+    jobs = [
+        (intv, fid, [data_dir / srcs[s] if s in srcs else None for s in sources])
+        for intv, dset in md["files"].items()
+        if intv not in special_keys
+        for fid, srcs in dset.items()
+    ]
+
+    def stage_args(stage, intv, fid, files):
+        ld = loc_data.get(intv, {}).get(fid)
+        ts = track_stats.get(intv, {}).get(fid)
+        if (stage != "locate" and ld is None) or (
+            stage in ("changepoints", "filter") and ts is None
+        ):
+            log(f"{stage}: no input data for interval {intv}, file {fid}")
+            return None
+        if stage == "locate":
+            return files
+        if stage == "track":
+            return [ld, *files]
+        return [ld, ts]
+
+    def store(stage, intv, fid, res):
+        if stage == "locate":
+            loc_data.setdefault(intv, {})[fid] = res
+        else:
+            loc_data.setdefault(intv, {})[fid] = res[0]
+            track_stats.setdefault(intv, {})[fid] = res[1]
+
+    file_stages = [s for s in stages[:-1] if s in run_stages]
+
+    with contextlib.ExitStack() as stack:
+        executor = None
+        n_workers = n_jobs if n_jobs >= 1 else (os.cpu_count() or 1)
+        if n_jobs != 1:
+            # Spawn workers since with `pipelined`, the first ones are started
+            # from a stage thread while other threads run, which is not safe
+            # to do by forking.
+            executor = stack.enter_context(
+                concurrent.futures.ProcessPoolExecutor(
+                    n_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            )
+
+        if pipelined and file_stages:
+            t0 = time.perf_counter()
+
+            def read(job):
+                if "locate" in file_stages or "track" in file_stages:
+                    for f in job[2]:
+                        if f is not None:
+                            _read_ahead(f)
+                return job
+
+            def make_step(stage):
+                def step(job):
+                    a = stage_args(stage, *job)
+                    if a is None:
+                        return job
+                    func = stage_funcs[stage]
+                    if executor is None or stage == "filter":
+                        res = func(*a)
+                    elif stage == "locate":
+                        # Split frames into chunks localized by all workers
+                        res = locate(
+                            _source_map(sources, a),
+                            func.pipeline,
+                            func.algorithm,
+                            func.options,
+                            n_workers,
+                            executor,
+                        )
+                    else:
+                        # Run in a worker so that localization of the next file
+                        # is not slowed down by this thread
+                        res = executor.submit(func, *a).result()
+                    store(stage, *job[:2], res)
+                    return job
+
+                return step
+
+            n = 0
+            for _ in _pipelined(jobs, [read, *map(make_step, file_stages)], queue_size):
+                n += 1
+            log(
+                f"{', '.join(file_stages)}: {n} files in "
+                f"{time.perf_counter() - t0:.1f} s"
+            )
+            file_stages = []
+
+        for stage in file_stages:
+            t0 = time.perf_counter()
+            keys = []
+            args = []
+            for intv, fid, files in jobs:
+                a = stage_args(stage, intv, fid, files)
+                if a is not None:
+                    keys.append((intv, fid))
+                    args.append(a)
+
+            func = stage_funcs[stage]
+            if executor is None or stage == "filter":
+                results = (func(*a) for a in args)
+            elif stage == "locate" and len(args) < n_workers:
+                # Too few files to keep all workers busy. Localize one file
+                # after another, splitting frames into chunks.
+                results = (
+                    locate(
+                        _source_map(sources, a),
+                        func.pipeline,
+                        func.algorithm,
+                        func.options,
+                        n_workers,
+                        executor,
+                    )
+                    for a in args
+                )
+            else:
+                results = executor.map(func, *zip(*args)) if args else []
+            for (intv, fid), res in zip(keys, results):
+                store(stage, intv, fid, res)
+            log(f"{stage}: {len(keys)} files in {time.perf_counter() - t0:.1f} s")
+
+        ana = None
+        if "fit" in run_stages:
+            ana = fit(
+                track_stats,
+                filter_options,
+                md.get("fit_options", {}),
+                n_jobs,
+                accept_undecided,
+                executor,
+            )
+            lt = ana.lifetime
+            log(
+                f"fit: lifetime {lt.lifetime:.4g} ± {lt.lifetime_err:.4g}, "
+                f"bleach {lt.bleach:.4g} ± {lt.bleach_err:.4g}"
+            )
+
+    if out_path is not False:
+        if out_path is None:
+            out_path = yaml_path
+        save_data(out_path, md, loc_data, track_stats)
+    return md, loc_data, track_stats, ana
+
+
+def main(argv: List[str] | None = None) -> int:
+    argp = argparse.ArgumentParser(
+        prog="python -m smfret_bondtime.pipeline",
+        description="Run analysis of a save file created using the GUI",
+    )
+    argp.add_argument("save", type=Path, help="Save file")
+    argp.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="Where to save results (default: overwrite input save file)",
+    )
+    argp.add_argument(
+        "-s",
+        "--stages",
+        default=",".join(stages),
+        help=f"Comma-separated list of stages to run (default: {','.join(stages)})",
+    )
+    argp.add_argument(
+        "-j", "--jobs", type=int, default=1, help="Number of worker processes"
+    )
+    argp.add_argument(
+        "--accept-undecided",
+        action="store_true",
+        help="Fit also tracks which were not accepted manually",
+    )
+    argp.add_argument(
+        "-p",
+        "--pipelined",
+        action="store_true",
+        help="Overlap reading, localization, tracking, etc. of consecutive files "
+        "instead of running each stage on all files at once",
+    )
+    argp.add_argument(
+        "--results",
+        type=Path,
+        help="Write lifetime and apparent lifetimes to this CSV file",
+    )
+    argp.add_argument(
+        "-n", "--no-save", action="store_true", help="Do not save results"
+    )
+    args = argp.parse_args(argv)
+
+    run_stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    _, _, _, ana = run(
+        args.save,
+        False if args.no_save else args.output,
+        run_stages,
+        args.jobs,
+        args.accept_undecided,
+        pipelined=args.pipelined,
+    )
+    if args.results is not None and ana is not None:
+        res = ana.apparent_lifetimes.copy()
+        for k, v in ana.lifetime._asdict().items():
+            res[k] = v
+        res.to_csv(args.results, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
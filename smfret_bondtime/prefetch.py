@@ -0,0 +1,112 @@
+# SPDX-FileCopyrightText: 2024 Lukas Schrangl <lukas.schrangl@boku.ac.at>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Read image frames ahead of time in a background thread"""
+
+import collections
+import concurrent.futures
+import threading
+from typing import Any, Sequence
+
+from sdt import helper
+
+default_depth = 8
+"""Default number of frames to read ahead"""
+
+
+class PrefetchSequence(helper.Slicerator):
+    """Image sequence wrapper which reads upcoming frames in a background thread
+
+    When a frame is requested, the next :py:attr:`depth` frames are read and
+    decoded in the background, assuming that access continues with the same
+    step (e.g., every other frame when selecting donor excitation frames of an
+    alternating excitation sequence). Frames not requested in the expected order
+    are read on demand. The most recently requested frame is kept, so that, e.g.,
+    accessing donor and acceptor channel ROIs of the same frame reads it only
+    once.
+
+    All reads from the wrapped sequence happen in the background thread, so it
+    must not be accessed otherwise while this is in use. Call :py:meth:`close`
+    or use as a context manager to stop the thread; the wrapped sequence is not
+    closed.
+
+    Since this is a :py:class:`sdt.helper.Slicerator`, it can be used with
+    :py:class:`sdt.roi.ROI`, :py:class:`sdt.multicolor.FrameSelector`, etc.
+    """
+
+    seq: Sequence
+    """Wrapped image sequence"""
+    depth: int
+    """Maximum number of frames to read ahead"""
+
+    def __init__(self, seq: Sequence, depth: int = default_depth):
+        """Parameters
+        ----------
+        seq
+            Image sequence to wrap, e.g., :py:class:`sdt.io.ImageSequence`
+        depth
+            Set :py:attr:`depth`
+        """
+        super().__init__(seq)
+        self.seq = seq
+        self.depth = depth
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            1, thread_name_prefix="prefetch"
+        )
+        self._lock = threading.Lock()
+        # Map of frame number -> future, bounded by `depth`
+        self._buffer = collections.OrderedDict()
+        self._last = None
+        self._last_frame = None
+        self._step = 1
+
+    def __getitem__(self, key):
+        if isinstance(key, (slice, collections.abc.Iterable)):
+            # Default implementation would slice `seq` directly
+            return helper.Slicerator(self)[key]
+        return super().__getitem__(key)
+
+    def _get(self, key: int) -> Any:
+        with self._lock:
+            if key == self._last:
+                return self._last_frame
+            if self._last is not None:
+                step = key - self._last
+                # Large jumps are random access, e.g., in the GUI
+                self._step = step if 0 < step <= self.depth else 1
+
+            fut = self._buffer.pop(key, None)
+            if fut is None:
+                fut = self._executor.submit(self.seq.__getitem__, key)
+
+            ahead = range(
+                key + self._step,
+                min(key + self._step * (self.depth + 1), len(self.seq)),
+                self._step,
+            )
+            for k in list(self._buffer):
+                if k not in ahead:
+                    self._buffer.pop(k).cancel()
+            for k in ahead:
+                if k not in self._buffer:
+                    self._buffer[k] = self._executor.submit(self.seq.__getitem__, k)
+
+            ret = fut.result()
+            self._last = key
+            self._last_frame = ret
+            return ret
+
+    def close(self):
+        """Stop reading ahead and wait for the background thread to finish"""
+        with self._lock:
+            self._buffer.clear()
+            self._last = None
+            self._last_frame = None
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,148 @@
+# SPDX-FileCopyrightText: 2024 Lukas Schrangl <lukas.schrangl@boku.ac.at>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Persistent cache for analysis results"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping
+
+import numpy as np
+
+from ._version import __version__
+
+
+class ResultCache:
+    """Size-bounded on-disk cache of arrays
+
+    Each entry is stored as a ``.npz`` file in a directory. Keys are typically
+    created using :py:meth:`make_key` from the input data and parameters of a
+    computation. When the total size exceeds :py:attr:`max_size`, least recently
+    used entries are removed. Several processes may share a cache directory.
+    """
+
+    path: Path
+    """Cache directory"""
+    max_size: int
+    """Maximum total size of cache files in bytes"""
+
+    def __init__(self, path: str | Path, max_size: int = 256 * 2**20):
+        """Parameters
+        ----------
+        path
+            Cache directory. Created when adding the first entry.
+        max_size
+            Maximum total size of cache files in bytes
+        """
+        self.path = Path(path)
+        self.max_size = max_size
+
+    @staticmethod
+    def make_key(params: Mapping[str, Any], arrays: Iterable[np.ndarray]) -> str:
+        """Compute key from parameters and data
+
+        The package version is included so that results are recomputed after
+        updates.
+
+        Parameters
+        ----------
+        params
+            JSON-serializable parameters
+        arrays
+            Input data. Dtype, shape, and content are hashed.
+
+        Returns
+        -------
+        Hex digest
+        """
+        h = hashlib.blake2b(digest_size=20)
+        h.update(
+            json.dumps(
+                {"version": __version__, **params}, sort_keys=True, default=str
+            ).encode()
+        )
+        for a in arrays:
+            a = np.ascontiguousarray(a)
+            h.update(f"{a.dtype.str}{a.shape}".encode())
+            h.update(a.data)
+        return h.hexdigest()
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{key}.npz"
+
+    def get(self, key: str) -> Dict[str, np.ndarray] | None:
+        """Get cache entry
+
+        Parameters
+        ----------
+        key
+            Entry key
+
+        Returns
+        -------
+        Map of name -> array or `None` if there is no such entry
+        """
+        f = self._file(key)
+        try:
+            with np.load(f, allow_pickle=False) as data:
+                ret = dict(data)
+        except (OSError, ValueError, EOFError):
+            return None
+        # Mark as recently used. Access times are unreliable (`noatime` mounts).
+        try:
+            os.utime(f)
+        except OSError:
+            pass
+        return ret
+
+    def put(self, key: str, data: Mapping[str, np.ndarray]):
+        """Add cache entry
+
+        Errors while writing are ignored.
+
+        Parameters
+        ----------
+        key
+            Entry key
+        data
+            Map of name -> array. Object arrays are not supported.
+        """
+        f = self._file(key)
+        tmp = f.with_name(f"{f.stem}.{os.getpid()}.tmp")
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            with tmp.open("wb") as fp:
+                np.savez(fp, **data)
+            tmp.replace(f)
+        except OSError:
+            return
+        finally:
+            tmp.unlink(missing_ok=True)
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the size limit is met"""
+        entries = []
+        for f in self.path.glob("*.npz"):
+            try:
+                st = f.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, f))
+        total = sum(e[1] for e in entries)
+        for _, size, f in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_size:
+                break
+            try:
+                f.unlink()
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        """Remove all entries"""
+        for f in self.path.glob("*.npz"):
+            f.unlink(missing_ok=True)
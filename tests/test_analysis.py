@@ -0,0 +1,114 @@
+# SPDX-FileCopyrightText: 2024 Lukas Schrangl <lukas.schrangl@boku.ac.at>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from smfret_bondtime.analysis import (
+    LifetimeAnalyzer,
+    TrackLengthHistogram,
+    fit_censored_exponential,
+)
+
+
+@pytest.fixture
+def track_stats():
+    """Simulated track stats for several recording intervals"""
+    rng = np.random.default_rng(0)
+    t_on = 20.0
+    c_bleach = 30.0
+    n_frames = 100
+    ret = {}
+    for intv in (0.5, 1.0, 2.0, 4.0, 8.0):
+        k = intv / t_on + 1 / c_bleach
+        track_len = rng.geometric(-np.expm1(-k), 400) + 1
+        censored = np.where(track_len >= n_frames, 2, 0)
+        censored[rng.random(len(censored)) < 0.1] |= 1
+        ret[intv] = {
+            0: pd.DataFrame(
+                {
+                    "track_len": np.minimum(track_len, n_frames),
+                    "censored": censored,
+                    "filter_param": rng.random(len(track_len)) < 0.05,
+                    "filter_manual": 0,
+                }
+            )
+        }
+    return ret
+
+
+def test_fit_censored_exponential_weighted(track_stats):
+    """Fit to histogram is the same as fit to individual tracks"""
+    ts = track_stats[1.0][0]
+    ts = ts[ts["track_len"] > 2]
+    counts = TrackLengthHistogram.count(ts["track_len"], ts["censored"])
+
+    expected = fit_censored_exponential(ts["track_len"], ts["censored"], entry=2)
+    res = fit_censored_exponential(
+        counts.track_len, counts.censored, entry=2, weights=counts.count
+    )
+    np.testing.assert_allclose(res, expected, rtol=1e-12)
+
+    weights = np.stack([counts.count, 2 * counts.count])
+    res = fit_censored_exponential(
+        counts.track_len, counts.censored, entry=2, weights=weights
+    )
+    np.testing.assert_allclose(res[0], [expected[0]] * 2, rtol=1e-12)
+
+
+@pytest.mark.parametrize("method", ["survival", "lifelines", "basic"])
+def test_histogram_analyzer(track_stats, method):
+    """Analysis of histograms yields the same results as of track stats"""
+    if method == "lifelines":
+        pytest.importorskip("lifelines")
+
+    expected = LifetimeAnalyzer(track_stats, min_track_length=3)
+    expected.calc_apparent_lifetimes(method)
+    expected.calc_lifetime()
+
+    hist = TrackLengthHistogram.from_track_stats(track_stats)
+    ana = LifetimeAnalyzer(hist, min_track_length=3)
+    ana.calc_apparent_lifetimes(method)
+    ana.calc_lifetime()
+
+    pd.testing.assert_frame_equal(
+        ana.apparent_lifetimes, expected.apparent_lifetimes, rtol=1e-7
+    )
+    np.testing.assert_allclose(ana.lifetime, expected.lifetime, rtol=1e-7)
+
+
+def test_bootstrap_engines(track_stats):
+    """Array and DataFrame bootstrap engines give the same statistics"""
+    n_boot = 500
+    res = {}
+    for engine in ("array", "dataframe"):
+        ana = LifetimeAnalyzer(track_stats, min_track_length=3)
+        ana.calc_lifetime_bootstrap(n_boot, 1, engine=engine)
+        assert ana.bootstrap_n_replicates == n_boot
+        assert len(ana.apparent_lifetimes) == len(track_stats)
+        res[engine] = ana.bootstrap_replicates
+
+    for r in ("lifetime", "lifetime_app"):
+        a = getattr(res["array"], r)
+        d = getattr(res["dataframe"], r)
+        assert a.shape == d.shape
+        a_mean = np.nanmean(a, axis=0)
+        d_mean = np.nanmean(d, axis=0)
+        a_std = np.nanstd(a, axis=0, ddof=1)
+        d_std = np.nanstd(d, axis=0, ddof=1)
+        # Means of replicates agree within a fraction of their spread, and spreads
+        # agree within sampling error of standard deviations of 500 replicates
+        np.testing.assert_array_less(np.abs(a_mean - d_mean), 0.25 * d_std)
+        np.testing.assert_allclose(a_std, d_std, rtol=0.25)
+
+
+def test_bootstrap_seed(track_stats):
+    """Array engine results only depend on the seed"""
+    res = []
+    for _ in range(2):
+        ana = LifetimeAnalyzer(track_stats)
+        ana.calc_lifetime_bootstrap(200, 3)
+        res.append(ana.bootstrap_replicates.lifetime)
+    np.testing.assert_array_equal(res[0], res[1])